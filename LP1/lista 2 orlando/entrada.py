@@ -0,0 +1,56 @@
+import argparse
+import sys
+
+# Leitura de números em lote (arquivo ou stdin) para os exercícios ex1, ex3
+# e ex4: os valores são lidos em sequência, sem guardar tudo na memória.
+
+BLOCO = 1 << 20   # caracteres lidos por vez no modo NumPy
+
+
+def argumentos(descricao):
+    """
+    Linha de comando comum: arquivo (ou "-" para stdin) e --numpy.
+    """
+    parser = argparse.ArgumentParser(description=descricao)
+    parser.add_argument("arquivo", help='arquivo com os números (separados por espaço ou linha); "-" = stdin')
+    parser.add_argument("--numpy", action="store_true", help="converte os números em blocos com NumPy")
+    return parser.parse_args()
+
+
+def abre(caminho):
+    return sys.stdin if caminho == "-" else open(caminho, encoding="utf-8")
+
+
+def numeros(arquivo, tipo=float):
+    """
+    Gera os números do arquivo um a um (uma linha por vez na memória).
+    """
+    for linha in arquivo:
+        for texto in linha.split():
+            yield tipo(texto)
+
+
+def blocos_numpy(arquivo, dtype=float, bloco=BLOCO):
+    """
+    Gera arrays NumPy com os números do arquivo, lendo `bloco` caracteres
+    por vez (o número cortado no fim de um bloco passa para o próximo).
+    """
+    import numpy as np
+
+    resto = ""
+    while True:
+        texto = arquivo.read(bloco)
+        if not texto:
+            break
+        texto = resto + texto
+        corte = max(texto.rfind(" "), texto.rfind("\n"), texto.rfind("\t"))
+        if corte < 0:
+            resto = texto
+            continue
+        resto = texto[corte + 1:]
+        # fromstring com sep=" " converte o texto em C (qualquer espaço separa)
+        valores = np.fromstring(texto[:corte], dtype=dtype, sep=" ")
+        if valores.size:
+            yield valores
+    if resto.strip():
+        yield np.fromstring(resto, dtype=dtype, sep=" ")
@@ -1,20 +1,57 @@
-qnt = int(input("quantas notas deseja informar?"))
-x = 0
-soma = 0
-y = 0
-lista = [] 
-
-while x < qnt:
-    lista.append(float(input('Qual é a {} nota que voce quer lançar?'.format(x))))
-    x = x+1
-
-while y < len(lista):
-    soma = soma + lista[y]
-    y += 1 
-
-media = soma/y
-print('Média do aluno: {}'.format(media))
-
-if media >= 7:
-    print('O Aluno foi aprovado!')
-else: print('O Aluno NÃO foi aprovado!')
\ No newline at end of file
+import sys
+
+
+def resultado(media):
+    print('Média do aluno: {}'.format(media))
+
+    if media >= 7:
+        print('O Aluno foi aprovado!')
+    else: print('O Aluno NÃO foi aprovado!')
+
+
+def media_arquivo(caminho, usar_numpy=False):
+    """
+    Média das notas de um arquivo (ou stdin) em uma passada, sem guardar a lista.
+    """
+    from entrada import abre, numeros, blocos_numpy
+
+    soma = 0
+    y = 0
+    with abre(caminho) as arquivo:
+        if usar_numpy:
+            for bloco in blocos_numpy(arquivo):
+                soma += float(bloco.sum())
+                y += bloco.size
+        else:
+            for nota in numeros(arquivo):
+                soma += nota
+                y += 1
+    return soma / y if y else None
+
+
+if len(sys.argv) > 1:
+    from entrada import argumentos
+
+    args = argumentos("Média das notas de um arquivo (uma ou mais notas por linha).")
+    media = media_arquivo(args.arquivo, args.numpy)
+    if media is None:
+        print("Nenhuma nota informada.")
+    else:
+        resultado(media)
+else:
+    qnt = int(input("quantas notas deseja informar?"))
+    x = 0
+    soma = 0
+    y = 0
+    lista = [] 
+
+    while x < qnt:
+        lista.append(float(input('Qual é a {} nota que voce quer lançar?'.format(x))))
+        x = x+1
+
+    while y < len(lista):
+        soma = soma + lista[y]
+        y += 1 
+
+    media = soma/y
+    resultado(media)
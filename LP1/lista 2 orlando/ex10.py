@@ -1,13 +1,136 @@
-numero = int(input("Digite um número: "))
-listaprimos = []
-
-for i in range(1, numero + 1):
-    primo = 1
-    for j in range(2, i):
-        if i % j == 0:
-            primo = 0
-    
-    if primo == 1:
-        listaprimos.append(i)
-
-print(listaprimos)
\ No newline at end of file
+import argparse
+import math
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress
+
+# Crivo de Eratóstenes segmentado: a lista de números até n é processada
+# em pedaços (segmentos) de tamanho fixo, então a memória não cresce com n.
+# Cada segmento guarda só os ímpares, 1 byte por número (1 = primo).
+
+SEGMENTO = 1 << 20   # ímpares por segmento (~1 MB)
+
+
+def primos_base(limite):
+    """
+    Primos ímpares até limite (crivo simples), usados para riscar os segmentos.
+    """
+    if limite < 3:
+        return []
+    crivo = bytearray([1]) * (limite + 1)
+    crivo[0:2] = b'\x00\x00'
+    for p in range(2, math.isqrt(limite) + 1):
+        if crivo[p]:
+            crivo[p * p::p] = bytes(len(range(p * p, limite + 1, p)))
+    return [p for p in range(3, limite + 1, 2) if crivo[p]]
+
+
+def marca_segmento(inicio, fim, base):
+    """
+    Crivo dos ímpares em [inicio, fim) (inicio ímpar): posição k = número
+    inicio + 2k, 1 se for primo.
+    """
+    tamanho = (fim - inicio + 1) // 2
+    seg = bytearray([1]) * tamanho
+    zeros = memoryview(bytes(tamanho))
+    for p in base:
+        if p * p >= fim:
+            break
+        primeiro = max(p * p, (inicio + p - 1) // p * p)
+        if primeiro % 2 == 0:
+            primeiro += p          # só múltiplos ímpares estão no segmento
+        k = (primeiro - inicio) // 2
+        if k < tamanho:
+            seg[k::p] = zeros[:(tamanho - 1 - k) // p + 1]
+    return seg
+
+
+def _primos_segmento(tarefa):
+    inicio, fim, base = tarefa
+    seg = marca_segmento(inicio, fim, base)
+    return list(compress(range(inicio, fim, 2), seg))
+
+
+def _conta_segmento(tarefa):
+    inicio, fim, base = tarefa
+    return marca_segmento(inicio, fim, base).count(1)
+
+
+def _tarefas(n, segmento):
+    base = primos_base(math.isqrt(n))
+    for inicio in range(3, n + 1, 2 * segmento):
+        yield inicio, min(inicio + 2 * segmento, n + 1), base
+
+
+def _executa(func, tarefas, processos):
+    """
+    Aplica func às tarefas, em ordem. Com processos > 1 usa um pool, com
+    no máximo 2 tarefas por processo em andamento (memória limitada).
+    """
+    if processos <= 1:
+        yield from map(func, tarefas)
+        return
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        pendentes = deque()
+        for tarefa in tarefas:
+            pendentes.append(pool.submit(func, tarefa))
+            if len(pendentes) >= 2 * processos:
+                yield pendentes.popleft().result()
+        while pendentes:
+            yield pendentes.popleft().result()
+
+
+def primos_em_blocos(n, processos=1, segmento=SEGMENTO):
+    """
+    Gera os primos até n em listas, uma por segmento, em ordem crescente.
+    """
+    if n >= 2:
+        yield [2]
+    if n >= 3:
+        yield from _executa(_primos_segmento, _tarefas(n, segmento), processos)
+
+
+def primos(n, processos=1, segmento=SEGMENTO):
+    """
+    Gerador com todos os primos até n (1 não é primo).
+    """
+    for bloco in primos_em_blocos(n, processos, segmento):
+        yield from bloco
+
+
+def conta_primos(n, processos=1, segmento=SEGMENTO):
+    """
+    Quantidade de primos até n, sem montar a lista.
+    """
+    if n < 2:
+        return 0
+    return 1 + sum(_executa(_conta_segmento, _tarefas(n, segmento), processos))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Primos até N (crivo segmentado).")
+    parser.add_argument("numero", type=int)
+    parser.add_argument("--processos", type=int, default=1,
+                        help=f"processos em paralelo (0 = todos os núcleos: {os.cpu_count()})")
+    parser.add_argument("--contar", action="store_true", help="mostra só a quantidade de primos")
+    args = parser.parse_args(argv)
+    processos = args.processos or os.cpu_count() or 1
+
+    if args.contar:
+        print(conta_primos(args.numero, processos))
+        return
+
+    # um primo por linha, escrito um segmento por vez
+    for bloco in primos_em_blocos(args.numero, processos):
+        sys.stdout.write("\n".join(map(str, bloco)) + "\n")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main()
+    else:
+        numero = int(input("Digite um número: "))
+        listaprimos = list(primos(numero))
+        print(listaprimos)
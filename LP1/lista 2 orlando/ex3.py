@@ -1,17 +1,54 @@
-numero_produto = 1
-lista_compra = []
+import sys
 
-preço_produto = float(input("Digite o preço do produto {}, para finalizar digite 0:  ".format(numero_produto)))
 
-while preço_produto != 0:
-    lista_compra.append(preço_produto)
-    numero_produto += 1
-    preço_produto = float(input("Digite o preço do produto {}, para finalizar digite 0:  ".format(numero_produto)))
+def mostra_total(total):
+    if total >= 100:
+        desconto = total * 0.10
+        print("O valor total da compra é R$ {:.2f}, com desconto de R$ {:.2f}, o valor final é R$ {:.2f}".format(total, desconto, total - desconto))
+    else:
+        print("O valor total da compra é R$ {:.2f}, sem desconto".format(total))
+
+
+def total_arquivo(caminho, usar_numpy=False):
+    """
+    Soma os preços de um arquivo (ou stdin) até o primeiro 0 ou o fim,
+    em uma passada e sem guardar a lista.
+    """
+    from entrada import abre, numeros, blocos_numpy
+
+    total = 0
+    with abre(caminho) as arquivo:
+        if usar_numpy:
+            import numpy as np
+
+            for bloco in blocos_numpy(arquivo):
+                zeros = np.flatnonzero(bloco == 0)
+                if zeros.size:
+                    total += float(bloco[:zeros[0]].sum())
+                    break
+                total += float(bloco.sum())
+        else:
+            for preço_produto in numeros(arquivo):
+                if preço_produto == 0:
+                    break
+                total += preço_produto
+    return total
 
 
-if sum(lista_compra) >= 100:
-    desconto = sum(lista_compra) * 0.10
-    print("O valor total da compra é R$ {:.2f}, com desconto de R$ {:.2f}, o valor final é R$ {:.2f}".format(sum(lista_compra), desconto, sum(lista_compra) - desconto))
+if len(sys.argv) > 1:
+    from entrada import argumentos
+
+    args = argumentos("Total da compra a partir de um arquivo de preços (0 finaliza).")
+    mostra_total(total_arquivo(args.arquivo, args.numpy))
 else:
-    print("O valor total da compra é R$ {:.2f}, sem desconto".format(sum(lista_compra)))
-    
\ No newline at end of file
+    numero_produto = 1
+    total = 0
+
+    preço_produto = float(input("Digite o preço do produto {}, para finalizar digite 0:  ".format(numero_produto)))
+
+    while preço_produto != 0:
+        total += preço_produto
+        numero_produto += 1
+        preço_produto = float(input("Digite o preço do produto {}, para finalizar digite 0:  ".format(numero_produto)))
+
+    mostra_total(total)
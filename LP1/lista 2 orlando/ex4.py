@@ -1,18 +1,57 @@
-numero = []
-pares = []
-impares = []
+import sys
 
-for i in range(10):
-    n = int(input("Digite o {} número: ".format(i + 1)))
-    numero.append(n)
 
+def mostra(qtd_pares, qtd_impares, soma_pares):
+    print(f"Quantidade de números pares: {qtd_pares}")
+    print(f"Quantidade de números ímpares: {qtd_impares}")
+    print(f"Soma dos números pares: {soma_pares}")
 
-for x in numero:
-    if x % 2 == 0:
-        pares.append(x)
-    else:
-        impares.append(x)
 
-print(f"Quantidade de números pares: {len(pares)}")
-print(f"Quantidade de números ímpares: {len(impares)}")
-print(f"Soma dos números pares: {sum(pares)}")
\ No newline at end of file
+def conta_arquivo(caminho, usar_numpy=False):
+    """
+    Contagem de pares/ímpares e soma dos pares de um arquivo (ou stdin),
+    em uma passada e sem guardar os números. O modo NumPy usa inteiros de
+    64 bits.
+    """
+    from entrada import abre, numeros, blocos_numpy
+
+    qtd_pares = qtd_impares = soma_pares = 0
+    with abre(caminho) as arquivo:
+        if usar_numpy:
+            for bloco in blocos_numpy(arquivo, dtype="int64"):
+                pares = bloco[bloco % 2 == 0]
+                qtd_pares += pares.size
+                qtd_impares += bloco.size - pares.size
+                soma_pares += int(pares.sum())
+        else:
+            for n in numeros(arquivo, int):
+                if n % 2 == 0:
+                    qtd_pares += 1
+                    soma_pares += n
+                else:
+                    qtd_impares += 1
+    return qtd_pares, qtd_impares, soma_pares
+
+
+if len(sys.argv) > 1:
+    from entrada import argumentos
+
+    args = argumentos("Pares e ímpares de um arquivo de números inteiros.")
+    mostra(*conta_arquivo(args.arquivo, args.numpy))
+else:
+    numero = []
+    pares = []
+    impares = []
+
+    for i in range(10):
+        n = int(input("Digite o {} número: ".format(i + 1)))
+        numero.append(n)
+
+
+    for x in numero:
+        if x % 2 == 0:
+            pares.append(x)
+        else:
+            impares.append(x)
+
+    mostra(len(pares), len(impares), sum(pares))
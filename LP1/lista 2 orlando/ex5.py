@@ -1,10 +1,13 @@
+from math import isqrt
+
 limite = int(input("Digite o número limite: "))
 if limite > 0:
-    soma = 0
-    n = 1
-    while soma <= limite:
-        soma += n
-        n += 1
-    print(f"A soma dos números naturais ultrapassou o limite de {limite} com o valor: {soma}, somando de 1 até {n-1}.")
+    # 1 + 2 + ... + k = k(k+1)/2 (número triangular). O maior k com soma
+    # <= limite é (isqrt(8*limite + 1) - 1) // 2; a soma passa do limite
+    # no termo seguinte.
+    k = (isqrt(8 * limite + 1) - 1) // 2
+    n = k + 1
+    soma = n * (n + 1) // 2
+    print(f"A soma dos números naturais ultrapassou o limite de {limite} com o valor: {soma}, somando de 1 até {n}.")
 else:
-    print("Digite um número positivo.")
\ No newline at end of file
+    print("Digite um número positivo.")
@@ -1,7 +1,12 @@
-y = 1
-while y <= 10:
-    x = 1                         # precisa reiniciar o x a cada novo y
-    while x <= 10:
-        print(f"{y} x {x} = {y * x}")
-        x += 1
-    y += 1
\ No newline at end of file
+import sys
+
+from saida import escreve_linhas
+
+# Tabuada de 1 a 10 (ou de 1 a N: python ex6.py N)
+tamanho = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+escreve_linhas(
+    f"{y} x {x} = {y * x}"
+    for y in range(1, tamanho + 1)
+    for x in range(1, tamanho + 1)    # o x recomeça em 1 a cada novo y
+)
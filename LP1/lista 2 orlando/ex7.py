@@ -1,7 +1,13 @@
-altura = int(input("Digite a altura: "))
-largura = int(input("Digite a largura: "))
+import sys
 
-for i in range(altura):
-    for j in range(largura):
-        print("*", end="")  # end evita a quebra de linha
-    print()
+from saida import escreve_linhas
+
+# python ex7.py ALTURA LARGURA (sem argumentos pergunta os valores)
+if len(sys.argv) > 2:
+    altura, largura = int(sys.argv[1]), int(sys.argv[2])
+else:
+    altura = int(input("Digite a altura: "))
+    largura = int(input("Digite a largura: "))
+
+linha = "*" * largura             # todas as linhas são iguais: monta uma vez só
+escreve_linhas(linha for _ in range(altura))
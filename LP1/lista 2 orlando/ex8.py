@@ -1,15 +1,27 @@
-numero = int(input("Digite um número: "))
+import sys
 
-triangulo = []
-x = 1
+from saida import escreve_linhas
 
-while x <= numero:
-    triangulo.append(x)
-    print(triangulo)
-    x += 1
 
+def linhas_triangulo(numero):
+    """
+    Mesmas linhas do laço original (a lista [1, 2, ..., x] a cada passo,
+    até 2 * numero), montando o texto de cada lista a partir do anterior
+    em vez de converter a lista inteira de novo.
+    """
+    texto = ""
+    for x in range(1, 2 * numero + 1):
+        texto = f"{texto}, {x}" if texto else str(x)
+        yield f"[{texto}]"
 
-for i in range(numero):
-    triangulo.append(x)
-    print(triangulo)
-    x += 1
\ No newline at end of file
+
+# python ex8.py N [--ultima] (sem argumentos pergunta o número);
+# --ultima mostra só a lista final
+argumentos = [a for a in sys.argv[1:] if a != "--ultima"]
+numero = int(argumentos[0]) if argumentos else int(input("Digite um número: "))
+
+if "--ultima" in sys.argv:
+    if numero > 0:
+        print("[" + ", ".join(map(str, range(1, 2 * numero + 1))) + "]")
+else:
+    escreve_linhas(linhas_triangulo(numero))
@@ -1,7 +1,23 @@
-numero = int(input("Digite um número: "))
+import sys
 
-for i in range(numero, 0, -1):
-    linha = []                   # cria uma nova lista para cada linha
-    for j in range(1, i + 1):
-        linha.append(j)
-    print(linha)
\ No newline at end of file
+from saida import escreve_linhas
+
+
+def linhas_triangulo(numero):
+    """
+    Linhas [1, 2, ..., i] para i de numero até 1. O texto da linha mais
+    longa é montado uma vez e cada linha é um pedaço dele.
+    """
+    completa = "[" + ", ".join(map(str, range(1, numero + 1)))
+    fins = []                          # onde termina o número j no texto
+    pos = 1
+    for j in range(1, numero + 1):
+        pos += len(str(j))
+        fins.append(pos)
+        pos += 2                       # ", "
+    for i in range(numero, 0, -1):
+        yield completa[:fins[i - 1]] + "]"
+
+
+numero = int(sys.argv[1]) if len(sys.argv) > 1 else int(input("Digite um número: "))
+escreve_linhas(linhas_triangulo(numero))
@@ -0,0 +1,25 @@
+import sys
+
+# Escrita em blocos para os exercícios que desenham tabelas/figuras (ex6 a
+# ex9): em vez de um print por linha (ou por caractere), as linhas são
+# juntadas e escritas com poucas chamadas grandes.
+
+BUFFER = 1 << 16   # caracteres por escrita
+
+
+def escreve_linhas(linhas, arquivo=None, buffer=BUFFER):
+    """
+    Escreve as linhas (sem o \\n) em blocos de ~buffer caracteres.
+    """
+    arquivo = arquivo or sys.stdout
+    bloco = []
+    tamanho = 0
+    for linha in linhas:
+        bloco.append(linha)
+        tamanho += len(linha) + 1
+        if tamanho >= buffer:
+            arquivo.write("\n".join(bloco) + "\n")
+            bloco = []
+            tamanho = 0
+    if bloco:
+        arquivo.write("\n".join(bloco) + "\n")
@@ -1,4 +1,7 @@
 # porta logica XOR usando MLP simples
+#
+# Versão com laços em Python, um exemplo por vez (didática). A versão
+# vetorizada e reutilizável fica em mlp.py; benchmark_mlp.py compara as duas.
 
 import math
 import random
@@ -37,95 +40,121 @@ epochs = 10000        # número de vezes que a rede vai treinar
 
     ##Inicialização dos pesos
 
-# Pesos da camada de entrada → camada oculta
-# matriz 2x2 (2 entradas × 2 neurônios ocultos)
-weights_input_hidden = [[random.uniform(-1, 1) for _ in range(hidden_neurons)] for _ in range(input_neurons)]
+def init_network(input_neurons=input_neurons, hidden_neurons=hidden_neurons,
+                 output_neurons=output_neurons, rng=random):
+    """
+    Cria os pesos e bias da rede com valores aleatórios entre -1 e 1.
+    """
+    return {
+        # Pesos da camada de entrada → camada oculta (entradas × neurônios ocultos)
+        'weights_input_hidden': [[rng.uniform(-1, 1) for _ in range(hidden_neurons)] for _ in range(input_neurons)],
+        # Pesos da camada oculta → saída (neurônios ocultos × saídas)
+        'weights_hidden_output': [[rng.uniform(-1, 1) for _ in range(output_neurons)] for _ in range(hidden_neurons)],
+        # Bias (um para cada neurônio oculto e um para cada saída)
+        'bias_hidden': [rng.uniform(-1, 1) for _ in range(hidden_neurons)],
+        'bias_output': [rng.uniform(-1, 1) for _ in range(output_neurons)],
+    }
+
+
+    ##Feedforward
+
+def feedforward(net, inputs):
+    """
+    Retorna (saídas da camada oculta, saídas da rede) para uma entrada.
+    """
+    weights_input_hidden = net['weights_input_hidden']
+    weights_hidden_output = net['weights_hidden_output']
+
+    # Camada oculta
+    hidden_layer = []
+    for j in range(len(net['bias_hidden'])):
+        sum_hidden = sum(inputs[i] * weights_input_hidden[i][j] for i in range(len(inputs))) + net['bias_hidden'][j]
+        hidden_layer.append(sigmoid(sum_hidden))
 
-# Pesos da camada oculta → saída
-# matriz 2x1 (2 neurônios ocultos × 1 saída)
-weights_hidden_output = [[random.uniform(-1, 1) for _ in range(output_neurons)] for _ in range(hidden_neurons)]
+    # Camada de saída
+    final_layer = []
+    for k in range(len(net['bias_output'])):
+        sum_output = sum(hidden_layer[j] * weights_hidden_output[j][k] for j in range(len(hidden_layer))) + net['bias_output'][k]
+        final_layer.append(sigmoid(sum_output))
 
-# Bias (um para cada neurônio oculto e um para a saída)
-bias_hidden = [random.uniform(-1, 1) for _ in range(hidden_neurons)]
-bias_output = [random.uniform(-1, 1) for _ in range(output_neurons)]
+    return hidden_layer, final_layer
 
 
     ##Treinamento (Backpropagation)
 
-for epoch in range(epochs):
+def train(net, training_data, learning_rate=learning_rate, epochs=epochs, log_every=1000):
+    """
+    Treina a rede exemplo a exemplo. Mostra o erro a cada log_every épocas
+    (0 = não mostra). Retorna o erro total da última época.
+    """
+    weights_input_hidden = net['weights_input_hidden']
+    weights_hidden_output = net['weights_hidden_output']
+    bias_hidden = net['bias_hidden']
+    bias_output = net['bias_output']
+    hidden_neurons = len(bias_hidden)
+    output_neurons = len(bias_output)
+
     total_error = 0
+    for epoch in range(epochs):
+        total_error = 0
 
-    for inputs, desired in training_data:
-        # ----------- Feedforward -----------
+        for inputs, desired in training_data:
+            # ----------- Feedforward -----------
+            hidden_layer, final_layer = feedforward(net, inputs)
 
-        # Camada oculta
-        hidden_layer = []
-        for j in range(hidden_neurons):
-            sum_hidden = sum(inputs[i] * weights_input_hidden[i][j] for i in range(input_neurons)) + bias_hidden[j]
-            hidden_output = sigmoid(sum_hidden)
-            hidden_layer.append(hidden_output)
+            # ----------- Cálculo do erro -----------
+            output_errors = [desired[k] - final_layer[k] for k in range(output_neurons)]
+            total_error += sum(e**2 for e in output_errors)  # erro quadrático
 
-        # Camada de saída
-        final_layer = []
-        for k in range(output_neurons):
-            sum_output = sum(hidden_layer[j] * weights_hidden_output[j][k] for j in range(hidden_neurons)) + bias_output[k]
-            final_output = sigmoid(sum_output)
-            final_layer.append(final_output)
+            # ----------- Backpropagation -----------
 
-        # ----------- Cálculo do erro -----------
-        output_errors = [desired[k] - final_layer[k] for k in range(output_neurons)]
-        total_error += sum(e**2 for e in output_errors)  # erro quadrático
+            # Erro da saída → delta
+            output_deltas = [output_errors[k] * sigmoid_derivative(final_layer[k]) for k in range(output_neurons)]
 
-        # ----------- Backpropagation -----------
+            # Erro da camada oculta
+            hidden_errors = [0] * hidden_neurons
+            for j in range(hidden_neurons):
+                hidden_errors[j] = sum(output_deltas[k] * weights_hidden_output[j][k] for k in range(output_neurons))
 
-        # Erro da saída → delta
-        output_deltas = [output_errors[k] * sigmoid_derivative(final_layer[k]) for k in range(output_neurons)]
+            # Delta da camada oculta
+            hidden_deltas = [hidden_errors[j] * sigmoid_derivative(hidden_layer[j]) for j in range(hidden_neurons)]
 
-        # Erro da camada oculta
-        hidden_errors = [0] * hidden_neurons
-        for j in range(hidden_neurons):
-            hidden_errors[j] = sum(output_deltas[k] * weights_hidden_output[j][k] for k in range(output_neurons))
+            # ----------- Atualização dos pesos -----------
 
-        # Delta da camada oculta
-        hidden_deltas = [hidden_errors[j] * sigmoid_derivative(hidden_layer[j]) for j in range(hidden_neurons)]
+            # Atualiza pesos da camada oculta → saída
+            for j in range(hidden_neurons):
+                for k in range(output_neurons):
+                    weights_hidden_output[j][k] += learning_rate * output_deltas[k] * hidden_layer[j]
 
-        # ----------- Atualização dos pesos -----------
+            # Atualiza pesos da entrada → camada oculta
+            for i in range(len(inputs)):
+                for j in range(hidden_neurons):
+                    weights_input_hidden[i][j] += learning_rate * hidden_deltas[j] * inputs[i]
 
-        # Atualiza pesos da camada oculta → saída
-        for j in range(hidden_neurons):
+            # Atualiza bias
             for k in range(output_neurons):
-                weights_hidden_output[j][k] += learning_rate * output_deltas[k] * hidden_layer[j]
-
-        # Atualiza pesos da entrada → camada oculta
-        for i in range(input_neurons):
+                bias_output[k] += learning_rate * output_deltas[k]
             for j in range(hidden_neurons):
-                weights_input_hidden[i][j] += learning_rate * hidden_deltas[j] * inputs[i]
+                bias_hidden[j] += learning_rate * hidden_deltas[j]
 
-        # Atualiza bias
-        for k in range(output_neurons):
-            bias_output[k] += learning_rate * output_deltas[k]
-        for j in range(hidden_neurons):
-            bias_hidden[j] += learning_rate * hidden_deltas[j]
+        # Mostrar progresso a cada log_every épocas
+        if log_every and epoch % log_every == 0:
+            print(f"Época {epoch}, Erro total: {total_error:.4f}")
 
-    # Mostrar progresso a cada 1000 épocas
-    if epoch % 1000 == 0:
-        print(f"Época {epoch}, Erro total: {total_error:.4f}")
+    return total_error
 
 
 ##Testando a rede
 
+def main():
+    net = init_network()
+    train(net, training_data)
 
-print("\n### Testando a rede treinada ###")
-for inputs, desired in training_data:
-    # Feedforward novamente
-    hidden_layer = []
-    for j in range(hidden_neurons):
-        soma = sum(inputs[i] * weights_input_hidden[i][j] for i in range(input_neurons)) + bias_hidden[j]
-        hidden_layer.append(sigmoid(soma))
+    print("\n### Testando a rede treinada ###")
+    for inputs, desired in training_data:
+        _, final_layer = feedforward(net, inputs)
+        print(f"Entrada: {inputs} → Saída prevista: {final_layer[0]:.4f} | Desejado: {desired[0]}")
 
-    final_layer = []
-    for k in range(output_neurons):
-        soma = sum(hidden_layer[j] * weights_hidden_output[j][k] for j in range(hidden_neurons)) + bias_output[k]
-        final_layer.append(sigmoid(soma))
 
-    print(f"Entrada: {inputs} → Saída prevista: {final_layer[0]:.4f} | Desejado: {desired[0]}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# Compara o MLP com laços (MultiLayerPerceptron_XOR.py) com o MLP
+# vetorizado (mlp.py): tempo por época no XOR e num dataset maior
+# (pontos aleatórios no quadrado [0, 1] x [0, 1] com rótulo XOR dos quadrantes).
+#
+#   python benchmark_mlp.py --samples 20000 --hidden 16
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+import MultiLayerPerceptron_XOR as xor_loop
+from mlp import MLP
+
+
+def dataset_quadrantes(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.random((n, 2))
+    Y = ((X[:, 0] > 0.5) != (X[:, 1] > 0.5)).astype(float).reshape(-1, 1)
+    return X, Y
+
+
+def mede(func):
+    inicio = time.perf_counter()
+    resultado = func()
+    return time.perf_counter() - inicio, resultado
+
+
+def acuracia_loop(net, data):
+    return np.mean([(xor_loop.feedforward(net, x)[1][0] >= 0.5) == y[0] for x, y in data])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MLP com laços x MLP vetorizado.")
+    parser.add_argument("--xor-epochs", type=int, default=10000)
+    parser.add_argument("--samples", type=int, default=20000, help="exemplos do dataset maior")
+    parser.add_argument("--hidden", type=int, default=16, help="neurônios ocultos no dataset maior")
+    parser.add_argument("--epochs", type=int, default=3, help="épocas da versão com laços no dataset maior")
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    # --- XOR (4 exemplos, rede 2-2-1) ---
+    X = np.array([x for x, _ in xor_loop.training_data], dtype=float)
+    Y = np.array([y for _, y in xor_loop.training_data], dtype=float)
+
+    net = xor_loop.init_network(rng=random.Random(0))
+    t_loop, _ = mede(lambda: xor_loop.train(net, xor_loop.training_data, epochs=args.xor_epochs, log_every=0))
+    rede = MLP([2, 2, 1], learning_rate=2.0, seed=0)
+    t_vet, _ = mede(lambda: rede.train(X, Y, epochs=args.xor_epochs, log_every=0))
+
+    print(f"### XOR, {args.xor_epochs} épocas ###")
+    print(f"laços:      {t_loop:8.3f}s  ({t_loop / args.xor_epochs * 1e6:7.1f} µs/época)")
+    print(f"vetorizado: {t_vet:8.3f}s  ({t_vet / args.xor_epochs * 1e6:7.1f} µs/época)  "
+          f"-> {t_loop / t_vet:.1f}x")
+
+    # --- Dataset maior ---
+    X, Y = dataset_quadrantes(args.samples)
+    data = [(list(x), list(y)) for x, y in zip(X, Y)]
+
+    net = xor_loop.init_network(2, args.hidden, 1, rng=random.Random(0))
+    t_loop, _ = mede(lambda: xor_loop.train(net, data, epochs=args.epochs, log_every=0))
+    rede = MLP([2, args.hidden, 1], learning_rate=2.0, seed=0)
+    t_vet, _ = mede(lambda: rede.train(X, Y, epochs=args.epochs, batch_size=args.batch_size, log_every=0))
+
+    por_epoca_loop = t_loop / args.epochs
+    por_epoca_vet = t_vet / args.epochs
+    print(f"\n### {args.samples} exemplos, rede 2-{args.hidden}-1, {args.epochs} épocas ###")
+    print(f"laços (1 exemplo por vez):     {por_epoca_loop:8.3f}s/época  acurácia {acuracia_loop(net, data):.3f}")
+    print(f"vetorizado (lotes de {args.batch_size:>4}):    {por_epoca_vet:8.3f}s/época  "
+          f"acurácia {np.mean((rede.predict(X) >= 0.5) == Y):.3f}  -> {por_epoca_loop / por_epoca_vet:.1f}x")
+    t_full, _ = mede(lambda: rede.train(X, Y, epochs=args.epochs, log_every=0))
+    print(f"vetorizado (lote completo):    {t_full / args.epochs:8.3f}s/época")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# MLP vetorizado com NumPy
+#
+# Mesma ideia do MultiLayerPerceptron_XOR.py (feedforward + backpropagation
+# com erro quadrático), mas com qualquer número de camadas e cada camada
+# calculada como uma multiplicação de matrizes sobre o lote inteiro.
+
+import numpy as np
+
+
+    ##Funções de ativação
+
+def sigmoid(x):
+    """
+    Sigmóide numericamente estável: não estoura exp() para x muito negativo.
+    """
+    e = np.exp(-np.abs(x))
+    return np.where(x >= 0, 1 / (1 + e), e / (1 + e))
+
+
+def relu(x):
+    return np.maximum(x, 0)
+
+
+# nome -> (função, derivada em termos da SAÍDA a da camada)
+ACTIVATIONS = {
+    'sigmoid': (sigmoid, lambda a: a * (1 - a)),
+    'tanh': (np.tanh, lambda a: 1 - a * a),
+    'relu': (relu, lambda a: (a > 0).astype(a.dtype)),
+    'linear': (lambda x: x, np.ones_like),
+}
+
+
+class MLP:
+    """
+    Rede multicamadas totalmente conectada.
+
+        rede = MLP([2, 2, 1], activations='sigmoid', learning_rate=2.0, seed=0)
+        rede.train(X, Y, epochs=10000, log_every=1000)
+        rede.predict(X)
+
+    layer_sizes = neurônios de cada camada, da entrada até a saída.
+    activations = um nome (para todas as camadas) ou uma lista com uma
+    ativação por camada (ver ACTIVATIONS).
+
+    Todos os pesos e bias ficam num único array contíguo (self.params);
+    self.weights / self.biases são visões dele, então a atualização de
+    todos os parâmetros é uma única operação.
+    """
+
+    def __init__(self, layer_sizes, activations='sigmoid', learning_rate=0.5, seed=None, dtype='float64'):
+        self.layer_sizes = list(layer_sizes)
+        n_camadas = len(self.layer_sizes) - 1
+        if isinstance(activations, str):
+            activations = [activations] * n_camadas
+        if len(activations) != n_camadas:
+            raise ValueError(f"Esperava {n_camadas} ativações, recebeu {len(activations)}")
+        self.activations = list(activations)
+        self.learning_rate = learning_rate
+
+        formas = [(n_in, n_out) for n_in, n_out in zip(self.layer_sizes, self.layer_sizes[1:])]
+        total = sum(n_in * n_out + n_out for n_in, n_out in formas)
+        rng = np.random.default_rng(seed)
+        self.params = rng.uniform(-1, 1, total).astype(dtype)  # mesma faixa do XOR original
+        self.grads = np.zeros_like(self.params)
+        self.weights, self.biases = self._views(self.params, formas)
+        self._grad_w, self._grad_b = self._views(self.grads, formas)
+
+    @staticmethod
+    def _views(flat, formas):
+        weights, biases = [], []
+        k = 0
+        for n_in, n_out in formas:
+            weights.append(flat[k:k + n_in * n_out].reshape(n_in, n_out))
+            k += n_in * n_out
+            biases.append(flat[k:k + n_out])
+            k += n_out
+        return weights, biases
+
+    def forward(self, X):
+        """
+        Saídas de todas as camadas (a primeira é a própria entrada).
+        """
+        saidas = [np.asarray(X, dtype=self.params.dtype)]
+        for W, b, nome in zip(self.weights, self.biases, self.activations):
+            saidas.append(ACTIVATIONS[nome][0](saidas[-1] @ W + b))
+        return saidas
+
+    def predict(self, X):
+        return self.forward(X)[-1]
+
+    def loss(self, X, Y):
+        """
+        Erro quadrático total (soma sobre exemplos e saídas), como no XOR.
+        """
+        return float(np.sum((np.asarray(Y) - self.predict(X)) ** 2))
+
+    def _step(self, X, Y):
+        """
+        Um passo de gradiente no lote (X, Y); retorna o erro quadrático do lote.
+        """
+        saidas = self.forward(X)
+        erro = Y - saidas[-1]
+        delta = erro * ACTIVATIONS[self.activations[-1]][1](saidas[-1])
+
+        for i in range(len(self.weights) - 1, -1, -1):
+            # gradiente médio do lote (o passo não cresce com o tamanho do lote)
+            np.matmul(saidas[i].T, delta, out=self._grad_w[i])
+            self._grad_w[i] /= X.shape[0]
+            self._grad_b[i][...] = delta.mean(axis=0)
+            if i:
+                delta = (delta @ self.weights[i].T) * ACTIVATIONS[self.activations[i - 1]][1](saidas[i])
+
+        self.params += self.learning_rate * self.grads
+        return float(np.sum(erro ** 2))
+
+    def train(self, X, Y, epochs=1000, batch_size=None, log_every=1000, seed=None):
+        """
+        Treina por backpropagation. batch_size=None treina com o lote
+        completo; senão em mini-lotes embaralhados a cada época.
+        Mostra o erro a cada log_every épocas (0/None = silencioso).
+        Retorna o erro total de cada época.
+        """
+        X = np.asarray(X, dtype=self.params.dtype)
+        Y = np.asarray(Y, dtype=self.params.dtype).reshape(X.shape[0], -1)
+        rng = np.random.default_rng(seed)
+        historico = np.empty(epochs)
+
+        for epoch in range(epochs):
+            if batch_size is None or batch_size >= X.shape[0]:
+                total_error = self._step(X, Y)
+            else:
+                ordem = rng.permutation(X.shape[0])
+                total_error = 0.0
+                for k in range(0, X.shape[0], batch_size):
+                    idx = ordem[k:k + batch_size]
+                    total_error += self._step(X[idx], Y[idx])
+            historico[epoch] = total_error
+
+            if log_every and epoch % log_every == 0:
+                print(f"Época {epoch}, Erro total: {total_error:.4f}")
+
+        return historico
@@ -14,9 +14,10 @@ def activation(sum_):
 
 # Função de treino do perceptron
 
-def train_perceptron(training_data, learning_rate=0.1, epochs=20):
+def train_perceptron(training_data, learning_rate=0.1, epochs=20, verbose=True):
     """
     Treina um perceptron simples em cima de uma tabela verdade.
+    verbose=False não mostra cada passo (para muitas redes, ver population.py).
     """
     # Inicialização dos pesos e bias
     weights = [0.5, 0.5]   # um peso para cada entrada
@@ -25,7 +26,8 @@ def train_perceptron(training_data, learning_rate=0.1, epochs=20):
 
     # Loop de épocas
     for epoch in range(epochs):
-        print(f"\n==== Época {epoch+1} ====")
+        if verbose:
+            print(f"\n==== Época {epoch+1} ====")
         error_total = 0
 
         # Loop pelos exemplos de treino
@@ -54,15 +56,18 @@ def train_perceptron(training_data, learning_rate=0.1, epochs=20):
             bias_weight = bias_weight + (learning_rate * error * bias)
 
             # Debug de cada exemplo
-            print(f"Inputs: {inputs}, Saída: {output}, Desejado: {desired}, Erro: {error}")
+            if verbose:
+                print(f"Inputs: {inputs}, Saída: {output}, Desejado: {desired}, Erro: {error}")
 
         # Se não houver erro na época, o treino para
         if error_total == 0:
-            print("\n✅ Rede aprendeu!")
+            if verbose:
+                print("\n✅ Rede aprendeu!")
             break
 
     # Resultado final
-    print(f"\nPesos finais: {weights}, Bias: {bias_weight}\n")
+    if verbose:
+        print(f"\nPesos finais: {weights}, Bias: {bias_weight}\n")
     return weights, bias_weight
 
 
@@ -85,8 +90,9 @@ OR = [
 
 # Execução
 
-print("### Treinando AND ###")
-train_perceptron(AND)
+if __name__ == "__main__":
+    print("### Treinando AND ###")
+    train_perceptron(AND)
 
-print("### Treinando OR ###")
-train_perceptron(OR)
+    print("### Treinando OR ###")
+    train_perceptron(OR)
@@ -0,0 +1,244 @@
+# Treino em lote de MUITAS redes independentes ao mesmo tempo
+#
+# Em vez de treinar uma rede por vez (perceptron_AND_OR.py,
+# MultiLayerPerceptron_XOR.py), os pesos de N redes ficam empilhados num
+# único tensor (primeira dimensão = rede) e um passo de treino atualiza
+# todas de uma vez. Cada rede para sozinha quando atinge seu critério de
+# convergência; no fim sai um relatório por rede.
+#
+#   python population.py --seeds 1000
+
+import argparse
+import itertools
+
+import numpy as np
+
+from mlp import ACTIVATIONS
+
+
+def _por_rede(valor, n):
+    """
+    Escalar ou lista -> array (n,) com um valor por rede.
+    """
+    return np.broadcast_to(np.asarray(valor, dtype=float), (n,)).copy()
+
+
+    ##Perceptrons
+
+class PerceptronPopulation:
+    """
+    N perceptrons com função degrau, treinados exemplo a exemplo como em
+    perceptron_AND_OR.train_perceptron (pesos e bias_weight começam em
+    init, bias constante = 1), mas todos juntos: cada passo processa o
+    mesmo exemplo em todas as redes ativas.
+
+    Uma rede para quando passa uma época inteira sem erro.
+    """
+
+    def __init__(self, n_inputs, n_networks, learning_rates=0.1, init=0.5):
+        self.weights = np.full((n_networks, n_inputs), init, dtype=float)
+        self.bias_weights = np.full(n_networks, init, dtype=float)
+        self.learning_rates = _por_rede(learning_rates, n_networks)
+
+    def predict(self, X):
+        """
+        Saídas (N, M) de todas as redes para as M entradas de X.
+        """
+        return (np.asarray(X, dtype=float) @ self.weights.T + self.bias_weights >= 0).T.astype(int)
+
+    def train(self, X, Y, epochs=20):
+        """
+        X = (M, n_inputs) entradas (iguais para todas as redes);
+        Y = (M,) ou (N, M) saídas desejadas (uma tabela verdade por rede).
+        Retorna as estatísticas de convergência (ver report).
+        """
+        X = np.asarray(X, dtype=float)
+        n = self.weights.shape[0]
+        Y = np.broadcast_to(np.asarray(Y, dtype=float), (n, X.shape[0]))
+
+        ativas = np.ones(n, dtype=bool)
+        epocas = np.full(n, epochs)
+        for epoch in range(epochs):
+            erro_total = np.zeros(n)
+            for m in range(X.shape[0]):
+                saida = (self.weights @ X[m] + self.bias_weights >= 0)
+                erro = (Y[:, m] - saida) * ativas   # redes que já aprenderam não mudam
+                erro_total += np.abs(erro)
+                passo = self.learning_rates * erro
+                self.weights += passo[:, None] * X[m]
+                self.bias_weights += passo
+
+            aprendeu = ativas & (erro_total == 0)
+            epocas[aprendeu] = epoch + 1
+            ativas &= ~aprendeu
+            if not ativas.any():
+                break
+
+        convergiu = ~ativas
+        return {
+            'converged': convergiu,
+            'epochs': epocas,
+            'errors': np.abs(self.predict(X) - Y).sum(axis=1),
+        }
+
+
+    ##MLPs
+
+class MLPPopulation:
+    """
+    N MLPs com a mesma arquitetura (mlp.MLP) e inicializações, taxas de
+    aprendizado e/ou alvos diferentes. Os pesos da camada i ficam num
+    tensor (N, n_in, n_out); o passo de treino (lote completo, gradiente
+    médio como no mlp.MLP) é feito com matmul em lote sobre as N redes.
+
+    Uma rede para quando o erro quadrático total fica abaixo de tol; as
+    redes que param saem dos tensores de trabalho, então o custo de cada
+    época cai conforme as redes convergem.
+    """
+
+    def __init__(self, layer_sizes, seeds, learning_rates=0.5, activations='sigmoid', dtype='float64'):
+        self.layer_sizes = list(layer_sizes)
+        n_camadas = len(self.layer_sizes) - 1
+        self.activations = [activations] * n_camadas if isinstance(activations, str) else list(activations)
+        self.seeds = list(seeds)
+        n = len(self.seeds)
+        self.learning_rates = _por_rede(learning_rates, n)
+
+        # Cada rede sorteia seus pesos com a própria seed, na faixa do XOR original
+        formas = list(zip(self.layer_sizes, self.layer_sizes[1:]))
+        total = sum(a * b + b for a, b in formas)
+        planos = np.stack([np.random.default_rng(s).uniform(-1, 1, total) for s in self.seeds]).astype(dtype)
+        self.weights, self.biases = [], []
+        k = 0
+        for n_in, n_out in formas:
+            self.weights.append(planos[:, k:k + n_in * n_out].reshape(n, n_in, n_out).copy())
+            k += n_in * n_out
+            self.biases.append(planos[:, k:k + n_out].copy())
+            k += n_out
+
+    @staticmethod
+    def _forward(X, weights, biases, activations):
+        saidas = [X]
+        for W, b, nome in zip(weights, biases, activations):
+            # (M, n_in) ou (N, M, n_in) @ (N, n_in, n_out) -> (N, M, n_out)
+            saidas.append(ACTIVATIONS[nome][0](saidas[-1] @ W + b[:, None, :]))
+        return saidas
+
+    def predict(self, X):
+        """
+        Saídas (N, M, n_out) de todas as redes.
+        """
+        X = np.asarray(X, dtype=self.weights[0].dtype)
+        return self._forward(X, self.weights, self.biases, self.activations)[-1]
+
+    def train(self, X, Y, epochs=10000, tol=0.05, log_every=0):
+        """
+        X = (M, n_in) entradas comuns; Y = (M, n_out) ou (N, M, n_out) alvos.
+        Retorna as estatísticas de convergência (ver report).
+        """
+        dtype = self.weights[0].dtype
+        X = np.asarray(X, dtype=dtype)
+        n = len(self.seeds)
+        Y = np.asarray(Y, dtype=dtype).reshape(-1, X.shape[0], self.layer_sizes[-1])
+        Y = np.broadcast_to(Y, (n, X.shape[0], self.layer_sizes[-1]))
+
+        # Tensores de trabalho só com as redes ainda ativas
+        idx = np.arange(n)
+        W = [w.copy() for w in self.weights]
+        B = [b.copy() for b in self.biases]
+        lr = self.learning_rates[:, None, None]
+        alvo = Y
+
+        epocas = np.full(n, epochs)
+        convergiu = np.zeros(n, dtype=bool)
+        erro_final = np.zeros(n)
+        # epoch = número de atualizações já feitas; a última volta só avalia
+        for epoch in range(epochs + 1):
+            saidas = self._forward(X, W, B, self.activations)
+            erro = alvo - saidas[-1]
+            perda = np.sum(erro ** 2, axis=(1, 2))
+
+            pronto = perda < tol
+            if pronto.any() or epoch == epochs:
+                fim = pronto if epoch < epochs else np.ones_like(pronto)
+                g = idx[fim]
+                convergiu[idx[pronto]] = True
+                epocas[idx[pronto]] = epoch
+                erro_final[g] = perda[fim]
+                for i in range(len(W)):
+                    self.weights[i][g] = W[i][fim]
+                    self.biases[i][g] = B[i][fim]
+                resto = ~fim
+                idx, lr, alvo = idx[resto], lr[resto], alvo[resto]
+                W = [w[resto] for w in W]
+                B = [b[resto] for b in B]
+                if not idx.size:
+                    break
+                saidas = [saidas[0]] + [s[resto] for s in saidas[1:]]
+                erro = erro[resto]
+
+            if log_every and epoch % log_every == 0:
+                print(f"Época {epoch}, redes ativas: {idx.size}, erro médio: {perda.mean():.4f}")
+
+            # Backpropagation em lote sobre as redes ativas
+            delta = erro * ACTIVATIONS[self.activations[-1]][1](saidas[-1])
+            for i in range(len(W) - 1, -1, -1):
+                entrada = saidas[i]
+                grad_w = np.swapaxes(entrada, -1, -2) @ delta / X.shape[0]
+                grad_b = delta.mean(axis=1)
+                if i:
+                    delta = (delta @ np.swapaxes(W[i], 1, 2)) * ACTIVATIONS[self.activations[i - 1]][1](saidas[i])
+                W[i] += lr * grad_w
+                B[i] += lr[:, 0] * grad_b
+
+        return {
+            'converged': convergiu,
+            'epochs': epocas,
+            'loss': erro_final,
+        }
+
+
+    ##Relatório
+
+def report(stats, labels=None, show=10):
+    """
+    Resumo da convergência: quantas redes convergiram e em quantas épocas
+    (mediana, média, máximo); lista até `show` redes (labels opcionais).
+    """
+    convergiu = stats['converged']
+    epocas = stats['epochs'][convergiu]
+    print(f"Redes que convergiram: {convergiu.sum()}/{convergiu.size} ({convergiu.mean():.1%})")
+    if epocas.size:
+        print(f"Épocas até convergir: mediana {np.median(epocas):.0f}, média {epocas.mean():.1f}, "
+              f"máx {epocas.max()}")
+    for k in range(min(show, convergiu.size)):
+        nome = labels[k] if labels is not None else f"rede {k}"
+        estado = f"convergiu em {stats['epochs'][k]} épocas" if convergiu[k] else "não convergiu"
+        print(f"  {nome}: {estado}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Treino em lote de muitas redes pequenas.")
+    parser.add_argument("--seeds", type=int, default=1000, help="inicializações do MLP 2-2-1 no XOR")
+    parser.add_argument("--epochs", type=int, default=10000)
+    parser.add_argument("--lr", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    entradas = np.array([[0, 0], [0, 1], [1, 0], [1, 1]])
+
+    # Todas as 16 funções lógicas de 2 entradas, um perceptron por tabela
+    tabelas = np.array(list(itertools.product([0, 1], repeat=4)))
+    print("### Perceptrons: as 16 tabelas verdade de 2 entradas ###")
+    pop = PerceptronPopulation(2, len(tabelas))
+    stats = pop.train(entradas, tabelas, epochs=20)
+    report(stats, labels=["".join(map(str, t)) for t in tabelas], show=16)
+
+    # XOR com MLP 2-2-1: a convergência depende da inicialização
+    print(f"\n### MLP 2-2-1 no XOR, {args.seeds} inicializações ###")
+    pop = MLPPopulation([2, 2, 1], seeds=range(args.seeds), learning_rates=args.lr)
+    stats = pop.train(entradas, [[0], [1], [1], [0]], epochs=args.epochs)
+    report(stats, show=0)
+
+
+if __name__ == "__main__":
+    main()
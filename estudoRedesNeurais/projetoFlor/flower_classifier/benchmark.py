@@ -0,0 +1,283 @@
+"""
+Benchmark das etapas do flower_classifier com imagens sintéticas.
+
+Etapas: load (try_load_image num pool de threads, como
+load_images_from_folder), patches (generate_patches por imagem), train
+(build_cnn().fit), predict (por imagem e em lote) e draw_save
+(desenha_contorno_unico + save_image). Para cada etapa registra tempo total,
+throughput, percentis de latência (por imagem; no train, por lote), pico de
+RSS e pico de memória do Python (tracemalloc, numa segunda execução), e
+grava tudo num JSON para comparar entre commits.
+
+    python benchmark.py --images 50 --size 640x480
+    python benchmark.py --compare benchmarks/anterior.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from dataset import generate_patches, list_image_files, patch_grid, patch_positions, try_load_image
+from drawing import save_image
+from inference import predict_batched
+from instrumentation import peak_rss_mb
+from main import desenha_contorno_unico
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+
+
+def make_synthetic_images(folder, count, size, seed=0):
+    """
+    Grava count imagens PNG (largura x altura = size) com ruído e um
+    retângulo colorido, sempre iguais para o mesmo seed.
+    """
+    rng = np.random.default_rng(seed)
+    w, h = size
+    os.makedirs(folder, exist_ok=True)
+    for k in range(count):
+        img = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+        y0, x0 = rng.integers(0, h // 2), rng.integers(0, w // 2)
+        img[y0:y0 + h // 3, x0:x0 + w // 3] = rng.integers(0, 256, 3, dtype=np.uint8)
+        Image.fromarray(img).save(os.path.join(folder, f"synthetic{k}.png"))
+
+
+def stage(name, func, items=None, repeat=True):
+    """
+    Roda func() medindo tempo e memória.
+    func pode devolver uma lista de latências (s) por item para os percentis.
+
+    Tempo e latências vêm de uma execução limpa (o tracemalloc deixa o
+    Python bem mais lento). Depois dela registra o pico de RSS do processo
+    (rss_peak_mb, inclui a memória nativa do TensorFlow) e quanto ele subiu
+    na etapa (rss_growth_mb). Com repeat=True, func roda de novo com o
+    tracemalloc para o pico de memória alocada pelo Python (peak_mb); use
+    repeat=False em etapas que não podem rodar duas vezes (ex.: treino).
+    """
+    rss_antes = peak_rss_mb()
+    inicio = time.perf_counter()
+    latencias = func()
+    total = time.perf_counter() - inicio
+    rss = peak_rss_mb()
+
+    result = {'seconds': total}
+    if rss is not None:
+        result.update({'rss_peak_mb': rss, 'rss_growth_mb': rss - rss_antes})
+    if repeat:
+        tracemalloc.start()
+        func()
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['peak_mb'] = pico / 2**20
+    if items:
+        result['items'] = items
+        result['items_per_s'] = items / total if total else None
+    if latencias:
+        p50, p90, p99 = np.percentile(np.array(latencias) * 1000, [50, 90, 99])
+        result.update({'p50_ms': float(p50), 'p90_ms': float(p90), 'p99_ms': float(p99)})
+    memoria = [f"pico Python {result['peak_mb']:.1f} MB"] if 'peak_mb' in result else []
+    if rss is not None:
+        memoria.append(f"RSS {rss:.0f} MB (+{rss - rss_antes:.0f})")
+    print(f"[{name}] {total:.3f}s, " + ", ".join(memoria)
+          + (f", {result['items_per_s']:.1f} itens/s" if items else ""))
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_PATH,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    w, h = (int(v) for v in args.size.lower().split("x"))
+    patch_size = (args.patch, args.patch)
+    results = {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'images': args.images,
+            'size': [w, h],
+            'patch_size': list(patch_size),
+            'epochs': args.epochs,
+            'batch_size': args.batch_size,
+            'seed': args.seed,
+        },
+        'stages': {},
+    }
+    stages = results['stages']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, "images")
+        make_synthetic_images(folder, args.images, (w, h), args.seed)
+
+        images = []
+
+        def load():
+            def carrega(path):
+                inicio = time.perf_counter()
+                img, erro = try_load_image(path)
+                return img, erro, time.perf_counter() - inicio
+
+            images.clear()   # a etapa roda duas vezes (tempo e memória)
+            lat = []
+            with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+                for path, (img, erro, t) in zip(paths, pool.map(carrega, paths)):
+                    if erro is not None:
+                        print(f"[ERRO] Falha ao carregar {path}: {erro}")
+                        continue
+                    images.append({'image': img, 'label': len(images) % 2})
+                    lat.append(t)
+            return lat
+        paths = list_image_files(folder)
+        stages['load'] = stage("load", load, items=args.images)
+
+        data = {}
+
+        def patches():
+            lat, partes = [], []
+            for item in images:
+                inicio = time.perf_counter()
+                partes.append(generate_patches([item], patch_size))
+                lat.append(time.perf_counter() - inicio)
+            data['X'] = np.concatenate([X for X, _ in partes])
+            data['y'] = np.concatenate([y for _, y in partes])
+            return lat
+        stages['patches'] = stage("patches", patches, items=args.images)
+        n_patches = int(data['X'].shape[0])
+        stages['patches']['patches'] = n_patches
+
+        try:
+            from cnn_model import build_cnn
+            import tensorflow  # noqa: F401  (só para saber se o TF está disponível)
+        except ImportError as e:
+            print(f"[AVISO] TensorFlow indisponível, pulando train/predict: {e}")
+            stages['train'] = stages['predict_per_image'] = stages['predict_batched'] = {'skipped': str(e)}
+            cnn = None
+        else:
+            cnn = build_cnn((patch_size[0], patch_size[1], 3))
+
+            def train():
+                from keras.callbacks import Callback
+
+                class PorLote(Callback):
+                    def on_train_batch_begin(self, batch, logs=None):
+                        self.inicio = time.perf_counter()
+
+                    def on_train_batch_end(self, batch, logs=None):
+                        lat.append(time.perf_counter() - self.inicio)
+
+                lat = []
+                cnn.fit(data['X'], data['y'], epochs=args.epochs, batch_size=64, verbose=0,
+                        callbacks=[PorLote()])
+                return lat
+            stages['train'] = stage("train", train, items=n_patches * args.epochs, repeat=False)
+
+            def per_image():
+                lat = []
+                for k, item in enumerate(images):
+                    inicio = time.perf_counter()
+                    for _ in predict_batched(cnn, [(k, item['image'])], patch_size, args.batch_size):
+                        pass
+                    lat.append(time.perf_counter() - inicio)
+                return lat
+            stages['predict_per_image'] = stage("predict_per_image", per_image, items=args.images)
+
+            preds = {}
+
+            def batched():
+                # latência = tempo entre uma imagem pronta e a próxima
+                lat = []
+                inicio = time.perf_counter()
+                for k, _, positions, p in predict_batched(
+                        cnn, ((k, item['image']) for k, item in enumerate(images)),
+                        patch_size, args.batch_size):
+                    preds[k] = (positions, p)
+                    agora = time.perf_counter()
+                    lat.append(agora - inicio)
+                    inicio = agora
+                return lat
+            stages['predict_batched'] = stage("predict_batched", batched, items=args.images)
+
+        out = os.path.join(tmp, "results")
+        os.makedirs(out, exist_ok=True)
+        rng = np.random.default_rng(args.seed)
+
+        def draw_save():
+            lat = []
+            for k, item in enumerate(images):
+                inicio = time.perf_counter()
+                if cnn is not None:
+                    positions, p = preds[k]
+                else:
+                    # sem modelo: scores aleatórios, só para medir o desenho/gravação
+                    positions = patch_positions(patch_grid(item['image'], patch_size).shape, patch_size)
+                    p = rng.random(positions.shape[0])
+                img = desenha_contorno_unico(item['image'].copy(), patch_size, positions, p)
+                save_image(os.path.join(out, f"resultado_{k}.png"), img)
+                lat.append(time.perf_counter() - inicio)
+            return lat
+        stages['draw_save'] = stage("draw_save", draw_save, items=args.images)
+
+    return results
+
+
+def compare(atual, anterior):
+    """
+    Mostra a razão de tempo (atual / anterior) de cada etapa.
+    """
+    print(f"\nComparação com {anterior['meta'].get('commit')} ({anterior['meta'].get('timestamp')}):")
+    for nome, r in atual['stages'].items():
+        antes = anterior['stages'].get(nome, {})
+        if 'seconds' in r and 'seconds' in antes and antes['seconds']:
+            razao = r['seconds'] / antes['seconds']
+            marca = "  <-- mais lento" if razao > 1.1 else ""
+            print(f"  {nome}: {antes['seconds']:.3f}s -> {r['seconds']:.3f}s (x{razao:.2f}){marca}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark das etapas do flower_classifier.")
+    parser.add_argument("--images", type=int, default=20)
+    parser.add_argument("--size", default="640x480", help="largura x altura das imagens sintéticas")
+    parser.add_argument("--patch", type=int, default=32)
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=4096, help="patches por chamada ao modelo")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="arquivo JSON (padrão: benchmarks/<data>_<commit>.json)")
+    parser.add_argument("--compare", default=None, help="JSON de uma execução anterior")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+
+    output = args.output
+    if output is None:
+        folder = os.path.join(BASE_PATH, "benchmarks")
+        os.makedirs(folder, exist_ok=True)
+        nome = time.strftime("%Y%m%d-%H%M%S") + f"_{results['meta']['commit'] or 'nogit'}.json"
+        output = os.path.join(folder, nome)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Resultados salvos em {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(results, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
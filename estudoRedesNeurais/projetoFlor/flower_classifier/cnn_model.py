@@ -1,29 +1,132 @@
-import tensorflow as tf
-from keras import layers, models
+import numpy as np
 
-print(tf.__version__)
+# TensorFlow/Keras são importados dentro das funções: importar este módulo
+# não carrega o framework (ver startup_check.py).
 
 
-def build_cnn(input_shape):
+def build_cnn(input_shape, filters=(16, 32), dense_units=64, optimizer='adam', learning_rate=None):
     """
     Cria e compila uma CNN simples para classificação binária (flor / não flor).
+
+    filters = número de filtros de cada bloco Conv2D 3x3 + MaxPooling 2x2;
+    dense_units = largura da camada Dense; optimizer = nome do otimizador
+    do Keras ('adam', 'sgd', 'rmsprop'...), com learning_rate opcional.
+    Os valores padrão dão a rede original.
+
+    A entrada são os pixels uint8 (0-255) e a normalização para [0, 1] é
+    feita no grafo (camada Rescaling): patches ficam em uint8 até o modelo.
     """
-    model = models.Sequential([
-        layers.Conv2D(16, (3, 3), activation='relu', input_shape=input_shape),
-        layers.MaxPooling2D((2, 2)),
+    from keras import layers, models, optimizers
 
-        layers.Conv2D(32, (3, 3), activation='relu'),
-        layers.MaxPooling2D((2, 2)),
+    camadas = [
+        layers.Input(shape=input_shape, dtype='uint8'),
+        layers.Rescaling(1.0 / 255),
+    ]
+    for n in filters:
+        camadas += [
+            layers.Conv2D(n, (3, 3), activation='relu'),
+            layers.MaxPooling2D((2, 2)),
+        ]
 
+    model = models.Sequential(camadas + [
         layers.Flatten(),
-        layers.Dense(64, activation='relu'),
+        layers.Dense(dense_units, activation='relu'),
         layers.Dense(1, activation='sigmoid')  # saída binária
     ])
 
+    if learning_rate is not None:
+        optimizer = optimizers.get({'class_name': optimizer, 'config': {'learning_rate': learning_rate}})
+
     model.compile(
-        optimizer='adam',
+        optimizer=optimizer,
         loss='binary_crossentropy',
         metrics=['accuracy']
     )
 
     return model
+
+
+def expects_raw_pixels(model):
+    """
+    True se o modelo recebe pixels 0-255 e normaliza no próprio grafo
+    (camada Rescaling do build_cnn); False para modelos .h5 antigos,
+    treinados com patches float32 já divididos por 255.
+    Modelos sem .layers (TFLiteModel) fazem a conversão sozinhos.
+    """
+    if not hasattr(model, 'layers'):
+        return True
+    from keras import layers
+
+    return any(isinstance(layer, layers.Rescaling) for layer in model.layers)
+
+
+def model_input(model, x):
+    """
+    Patches uint8 no formato de entrada do modelo: sem cópia para modelos
+    com Rescaling; float32 em [0, 1] para modelos antigos.
+    """
+    if expects_raw_pixels(model):
+        return x
+    return np.asarray(x, dtype='float32') / 255.0
+
+
+def total_stride(model):
+    """
+    Passo total (em pixels) das camadas Conv2D/MaxPooling2D do modelo.
+    Para o build_cnn padrão é 4 (dois MaxPooling 2x2).
+    """
+    from keras import layers
+
+    stride = 1
+    for layer in model.layers:
+        if isinstance(layer, (layers.Conv2D, layers.MaxPooling2D)):
+            stride *= layer.strides[0]
+    return stride
+
+
+def build_fcn_from_cnn(cnn):
+    """
+    Converte a CNN treinada (cabeça Dense) numa rede totalmente convolucional
+    com os mesmos pesos: o primeiro Dense após o Flatten vira um Conv2D com
+    kernel do tamanho do mapa achatado e os demais Dense viram Conv2D 1x1.
+
+    A rede resultante aceita imagens de qualquer tamanho e devolve, numa única
+    passada, um mapa de calor (1, H', W', 1) em que cada ponto é o score do
+    patch cujo canto superior esquerdo está em (y * stride, x * stride).
+    """
+    from keras import layers, models
+
+    entrada = layers.Input(shape=(None, None, cnn.input_shape[-1]), dtype=cnn.input.dtype)
+    x = entrada
+    flatten_shape = None
+
+    for layer in cnn.layers:
+        if isinstance(layer, layers.Flatten):
+            flatten_shape = layer.input_shape[1:]  # (h, w, canais)
+            continue
+
+        if isinstance(layer, layers.Dense):
+            kernel, bias = layer.get_weights()
+            if flatten_shape is not None:
+                h, w, c = flatten_shape
+                novo = layers.Conv2D(layer.units, (h, w), activation=layer.activation)
+                kernel = kernel.reshape(h, w, c, layer.units)
+                flatten_shape = None
+            else:
+                novo = layers.Conv2D(layer.units, (1, 1), activation=layer.activation)
+                kernel = kernel.reshape(1, 1, -1, layer.units)
+            x = novo(x)
+            novo.set_weights([kernel, bias])
+            continue
+
+        if isinstance(layer, layers.Dropout):
+            continue
+
+        config = layer.get_config()
+        config.pop('batch_input_shape', None)
+        novo = layer.__class__.from_config(config)
+        x = novo(x)
+        if layer.get_weights():
+            novo.set_weights(layer.get_weights())
+
+    return models.Model(entrada, x)
@@ -1,46 +1,146 @@
 from PIL import Image
 import numpy as np
 import os
+from concurrent.futures import ThreadPoolExecutor
 
-def load_images_from_folder(folder, label):
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def list_image_files(folder):
+    """
+    Lista (em ordem) os caminhos das imagens de uma pasta.
+    """
+    return [
+        os.path.join(folder, filename)
+        for filename in sorted(os.listdir(folder))
+        if filename.lower().endswith(IMAGE_EXTENSIONS)
+    ]
+
+
+def list_labeled_files(sources):
+    """
+    sources = [(pasta, label), ...] -> [(caminho, label), ...]
+    """
+    arquivos = []
+    for folder, label in sources:
+        if not os.path.exists(folder):
+            print(f"[ERRO] Pasta não encontrada: {folder}")
+            continue
+        arquivos.extend((img_path, label) for img_path in list_image_files(folder))
+    return arquivos
+
+
+def load_image(img_path):
+    """
+    Abre uma imagem como array RGB (uint8).
+    """
+    return np.array(Image.open(img_path).convert('RGB'))
+
+
+def try_load_image(img_path):
+    """
+    Versão de load_image que devolve o erro em vez de lançar (para o pool).
+    """
+    try:
+        return load_image(img_path), None
+    except Exception as e:
+        return None, e
+
+
+def load_images_from_folder(folder, label, workers=None, verbose=False):
     """
     Carrega imagens de uma pasta e atribui um label.
     label = 1 -> flor
     label = 0 -> não flor
+
+    As imagens são decodificadas em paralelo por um pool de threads
+    (o PIL libera o GIL durante a decodificação). workers = número de
+    threads (None -> os.cpu_count()). Progresso e erros são resumidos
+    no final; verbose=True volta a mostrar uma linha por imagem.
     """
     images = []
     if not os.path.exists(folder):
         print(f"[ERRO] Pasta não encontrada: {folder}")
         return images
 
-    for filename in os.listdir(folder):
-        if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-            img_path = os.path.join(folder, filename)
-            try:
-                img = Image.open(img_path).convert('RGB')
-                img = np.array(img)
-                images.append({'image': img, 'label': label})
+    paths = list_image_files(folder)
+    workers = workers or os.cpu_count() or 1
+    erros = []
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # map mantém a ordem dos arquivos
+        for img_path, (img, erro) in zip(paths, pool.map(try_load_image, paths)):
+            if erro is not None:
+                erros.append((img_path, erro))
+                continue
+            images.append({'image': img, 'label': label})
+            if verbose:
                 print(f"Carregada: {img_path} - shape: {img.shape}")
-            except Exception as e:
-                print(f"[ERRO] Falha ao carregar {img_path}: {e}")
+
+    print(f"Carregadas {len(images)}/{len(paths)} imagens de {folder} ({workers} threads)")
+    for img_path, erro in erros:
+        print(f"[ERRO] Falha ao carregar {img_path}: {erro}")
     return images
 
-def generate_patches(images, patch_size=(32, 32)):
+
+def patch_grid(img, patch_size=(32, 32), stride=None):
+    """
+    Retorna uma visão (sem cópia) de todos os patches da imagem,
+    com shape (n_linhas, n_colunas, altura, largura, canais).
+    stride = passo entre janelas; None -> patch_size (sem sobreposição).
+    """
+    ph, pw = patch_size
+    sh, sw = stride or patch_size
+    h, w = img.shape[:2]
+    nh = (h - ph) // sh + 1 if h >= ph else 0
+    nw = (w - pw) // sw + 1 if w >= pw else 0
+    s0, s1 = img.strides[:2]
+    return np.lib.stride_tricks.as_strided(
+        img,
+        shape=(nh, nw, ph, pw) + img.shape[2:],
+        strides=(s0 * sh, s1 * sw, s0, s1) + img.strides[2:],
+        writeable=False
+    )
+
+
+def patch_positions(grid_shape, stride):
+    """
+    Posições (i, j) do canto superior esquerdo de cada patch de uma grade,
+    na mesma ordem de grid.reshape(-1, ...). Retorna array (N, 2).
+    """
+    nh, nw = grid_shape[:2]
+    ii, jj = np.meshgrid(np.arange(nh) * stride[0], np.arange(nw) * stride[1], indexing='ij')
+    return np.stack([ii.ravel(), jj.ravel()], axis=1)
+
+
+def extract_patches(img, patch_size=(32, 32), stride=None):
+    """
+    Extrai todos os patches de uma imagem de uma vez.
+    Retorna (patches, positions): patches com shape (N, altura, largura, canais)
+    e positions com shape (N, 2), cada linha = (i, j).
+    """
+    stride = stride or patch_size
+    grid = patch_grid(img, patch_size, stride)
+    patches = grid.reshape((-1,) + grid.shape[2:])  # única cópia
+    return patches, patch_positions(grid.shape, stride)
+
+
+def generate_patches(images, patch_size=(32, 32), stride=None):
     """
     Quebra cada imagem em patches de patch_size
     e retorna X (patches) e y (labels).
     """
-    X, y = [], []
-    for item in images:
-        img = item['image']
-        label = item['label']
-        h, w = img.shape[:2]
+    grids = [patch_grid(item['image'], patch_size, stride) for item in images]
+    counts = [g.shape[0] * g.shape[1] for g in grids]
+    total = sum(counts)
+    X = np.empty((total, patch_size[0], patch_size[1], 3), dtype=np.uint8)
+    y = np.empty(total, dtype=int)
 
-        for i in range(0, h - patch_size[0] + 1, patch_size[0]):
-            for j in range(0, w - patch_size[1] + 1, patch_size[1]):
-                patch = img[i:i+patch_size[0], j:j+patch_size[1]]
-                if patch.shape == (patch_size[0], patch_size[1], 3):
-                    X.append(patch)
-                    y.append(label)
+    k = 0
+    for grid, n, item in zip(grids, counts, images):
+        # Copia a grade direto para o bloco de X (sem listas intermediárias)
+        X[k:k+n].reshape(grid.shape)[...] = grid
+        y[k:k+n] = item['label']
+        k += n
 
-    return np.array(X), np.array(y)  # y como vetor 1D (mais padrão)
+    return X, y  # y como vetor 1D (mais padrão)
@@ -0,0 +1,185 @@
+from collections import deque
+
+import numpy as np
+from PIL import Image
+
+from drawing import _cv2
+from inference import predict_batched
+from instrumentation import stage
+
+DEFAULT_SCALES = (1.0, 0.7, 0.5)
+
+
+def resize(img, scale):
+    """
+    Imagem RGB reduzida (ou ampliada) pelo fator scale.
+    """
+    h, w = img.shape[:2]
+    tamanho = (max(1, round(w * scale)), max(1, round(h * scale)))
+    return np.array(Image.fromarray(img).resize(tamanho, Image.BILINEAR))
+
+
+def predict_multiscale(cnn, images, scales=DEFAULT_SCALES, patch_size=(32, 32), batch_size=4096,
+                       stride=None, prefilter=None, metrics=None):
+    """
+    Avalia cada imagem numa pirâmide de escalas. Todos os níveis (de todas
+    as imagens) entram no mesmo fluxo de predict_batched, então os lotes
+    misturam patches de escalas diferentes e o número de chamadas ao modelo
+    depende do total de patches, não do número de escalas. Reduzir a
+    imagem faz a janela fixa cobrir objetos maiores; o custo total é
+    ~ sum(scale²) x o custo da escala 1.
+
+    Gera (nome, img, niveis), com niveis = [(escala_y, escala_x, grade), ...]
+    e grade = scores (n_linhas, n_colunas) das janelas daquele nível.
+    """
+    stride = stride or patch_size
+    originais = deque()
+
+    def niveis():
+        for nome, img in images:
+            originais.append((nome, img))
+            for k, escala in enumerate(scales):
+                with stage(metrics, "pyramid"):
+                    nivel = img if escala == 1 else resize(img, escala)
+                yield (nome, k), nivel
+
+    atual = []
+    for (_, k), nivel, _, preds in predict_batched(cnn, niveis(), patch_size, batch_size, stride,
+                                                   prefilter=prefilter, metrics=metrics):
+        nome, img = originais[0]
+        h, w = nivel.shape[:2]
+        nh = (h - patch_size[0]) // stride[0] + 1 if h >= patch_size[0] else 0
+        nw = (w - patch_size[1]) // stride[1] + 1 if w >= patch_size[1] else 0
+        atual.append((h / img.shape[0], w / img.shape[1], preds.reshape(nh, nw)))
+        if k == len(scales) - 1:
+            originais.popleft()
+            yield nome, img, atual
+            atual = []
+
+
+def label_components(mask):
+    """
+    Rotula as regiões conectadas (vizinhança de 8) de uma máscara booleana.
+    Retorna (labels, n): labels = 0 no fundo e 1..n nas regiões.
+
+    Usa o OpenCV quando instalado; senão propaga, em NumPy, o menor rótulo
+    entre vizinhos até estabilizar (com "pointer jumping" para convergir em
+    poucas iterações).
+    """
+    mask = np.asarray(mask, dtype=bool)
+    if not mask.any():
+        return np.zeros(mask.shape, dtype=int), 0
+    cv2 = _cv2()
+    if cv2 is not None:
+        n, labels = cv2.connectedComponents(mask.astype(np.uint8), connectivity=8)
+        return labels, n - 1
+
+    h, w = mask.shape
+    fundo = h * w + 1
+    # rótulo inicial = índice do pixel + 1 (cada rótulo aponta para um pixel da própria região)
+    labels = np.where(mask, np.arange(1, h * w + 1).reshape(h, w), fundo)
+    while True:
+        pad = np.pad(labels, 1, constant_values=fundo)
+        vizinhos = np.minimum.reduce([
+            pad[1 + dy:1 + dy + h, 1 + dx:1 + dx + w]
+            for dy in (-1, 0, 1) for dx in (-1, 0, 1)
+        ])
+        novo = np.where(mask, vizinhos, fundo)
+        plano = novo.reshape(-1)
+        novo = np.where(mask, plano[np.minimum(novo, h * w) - 1].reshape(h, w), fundo)  # pointer jumping
+        if np.array_equal(novo, labels):
+            break
+        labels = novo
+
+    unicos, inverso = np.unique(labels, return_inverse=True)
+    n = int(np.sum(unicos != fundo))
+    labels = np.where(mask, inverso.reshape(h, w) + 1, 0)
+    return labels, n
+
+
+def region_boxes(grade, threshold, patch_size=(32, 32), stride=None, escala=(1.0, 1.0)):
+    """
+    Caixas (x0, y0, x1, y1) em coordenadas da imagem original e score
+    (máximo) de cada região conectada de janelas com score >= threshold.
+    """
+    stride = stride or patch_size
+    labels, n = label_components(grade >= threshold)
+    if n == 0:
+        return np.zeros((0, 4)), np.zeros(0)
+
+    linhas, colunas = np.nonzero(labels)
+    rotulo = labels[linhas, colunas] - 1
+    y0 = np.full(n, np.inf)
+    x0 = np.full(n, np.inf)
+    y1 = np.full(n, -np.inf)
+    x1 = np.full(n, -np.inf)
+    scores = np.zeros(n)
+    np.minimum.at(y0, rotulo, linhas)
+    np.minimum.at(x0, rotulo, colunas)
+    np.maximum.at(y1, rotulo, linhas)
+    np.maximum.at(x1, rotulo, colunas)
+    np.maximum.at(scores, rotulo, grade[linhas, colunas])
+
+    sy, sx = escala
+    boxes = np.stack([
+        x0 * stride[1] / sx,
+        y0 * stride[0] / sy,
+        (x1 * stride[1] + patch_size[1]) / sx,
+        (y1 * stride[0] + patch_size[0]) / sy,
+    ], axis=1)
+    return boxes, scores
+
+
+def box_iou(a, b):
+    """
+    IoU entre todas as caixas de a (N, 4) e b (M, 4) -> (N, M).
+    """
+    x0 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y0 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x1 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y1 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x1 - x0, 0, None) * np.clip(y1 - y0, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def nms(boxes, scores, iou_threshold=0.3):
+    """
+    Non-maximum suppression: índices das caixas mantidas, da maior para a
+    menor score. A matriz de IoU é calculada uma vez; cada caixa mantida
+    descarta de uma vez todas as que se sobrepõem a ela.
+    """
+    ordem = np.argsort(-scores, kind='stable')
+    iou = box_iou(boxes[ordem], boxes[ordem])
+    vivo = np.ones(ordem.size, dtype=bool)
+    for k in range(ordem.size):
+        if vivo[k]:
+            vivo[k + 1:] &= iou[k, k + 1:] <= iou_threshold
+    return ordem[vivo]
+
+
+def detect(niveis, threshold=0.5, iou_threshold=0.3, patch_size=(32, 32), stride=None):
+    """
+    Junta as regiões de todos os níveis da pirâmide e aplica NMS.
+    Retorna (boxes (K, 4) int, scores (K,)).
+    """
+    partes = [region_boxes(grade, threshold, patch_size, stride, (sy, sx)) for sy, sx, grade in niveis]
+    boxes = np.concatenate([b for b, _ in partes]) if partes else np.zeros((0, 4))
+    scores = np.concatenate([s for _, s in partes]) if partes else np.zeros(0)
+    if boxes.shape[0] == 0:
+        return boxes.astype(int), scores
+    manter = nms(boxes, scores, iou_threshold)
+    return np.round(boxes[manter]).astype(int), scores[manter]
+
+
+def detect_multiscale(cnn, images, scales=DEFAULT_SCALES, patch_size=(32, 32), threshold=0.5,
+                      iou_threshold=0.3, batch_size=4096, stride=None, prefilter=None, metrics=None):
+    """
+    Detecção em várias escalas: gera (nome, img, boxes, scores) por imagem.
+    """
+    for nome, img, niveis in predict_multiscale(cnn, images, scales, patch_size, batch_size, stride,
+                                                prefilter, metrics):
+        with stage(metrics, "regions"):
+            boxes, scores = detect(niveis, threshold, iou_threshold, patch_size, stride)
+        yield nome, img, boxes, scores
@@ -0,0 +1,58 @@
+import numpy as np
+
+
+def _cv2():
+    """
+    OpenCV é opcional: retorna o módulo cv2 se estiver instalado, senão None.
+    """
+    try:
+        import cv2
+    except ImportError:
+        return None
+    return cv2
+
+
+def draw_rectangle(img, box, color=(255, 0, 255), thickness=3):
+    """
+    Desenha o contorno de box = (x0, y0, x1, y1) na imagem RGB (in-place),
+    com a linha centrada na borda como no cv2.rectangle, usando só NumPy.
+    """
+    x0, y0, x1, y1 = box
+    h, w = img.shape[:2]
+    a = thickness // 2
+    b = thickness - a
+
+    def faixa(r0, r1, c0, c1):
+        r0, r1 = max(r0, 0), min(r1, h)
+        c0, c1 = max(c0, 0), min(c1, w)
+        if r0 < r1 and c0 < c1:
+            img[r0:r1, c0:c1] = color
+
+    faixa(y0 - a, y0 + b, x0 - a, x1 + b)  # topo
+    faixa(y1 - a, y1 + b, x0 - a, x1 + b)  # base
+    faixa(y0 - a, y1 + b, x0 - a, x0 + b)  # esquerda
+    faixa(y0 - a, y1 + b, x1 - a, x1 + b)  # direita
+    return img
+
+
+def draw_boxes(img, boxes, color=(255, 0, 255), thickness=3):
+    """
+    Desenha várias caixas (x0, y0, x1, y1) na imagem (in-place).
+    """
+    for box in boxes:
+        draw_rectangle(img, tuple(int(v) for v in box), color, thickness)
+    return img
+
+
+def save_image(path, img):
+    """
+    Salva uma imagem RGB (uint8). Usa cv2.imwrite quando o OpenCV está
+    disponível e o PIL caso contrário.
+    """
+    img = np.ascontiguousarray(img, dtype=np.uint8)
+    cv2 = _cv2()
+    if cv2 is not None:
+        cv2.imwrite(path, cv2.cvtColor(img, cv2.COLOR_RGB2BGR))
+    else:
+        from PIL import Image
+        Image.fromarray(img).save(path)
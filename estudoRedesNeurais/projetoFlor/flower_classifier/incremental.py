@@ -0,0 +1,144 @@
+import json
+import os
+import random
+
+import numpy as np
+
+from cnn_model import model_input
+from dataset import extract_patches, try_load_image
+from patch_cache import file_sha1
+from training import fit_controlled, split_indices
+
+
+def manifest_path_for(model_path):
+    """
+    model/cnn_model.h5 -> model/cnn_model.manifest.json
+    """
+    return os.path.splitext(model_path)[0] + ".manifest.json"
+
+
+def build_manifest(files, patch_size):
+    """
+    Manifesto do dataset usado num treino: hash do conteúdo e label de cada
+    imagem, mais o patch_size.
+    """
+    return {
+        'patch_size': list(patch_size),
+        'files': {
+            os.path.abspath(img_path): {'label': label, 'sha1': file_sha1(img_path)}
+            for img_path, label in files
+        },
+    }
+
+
+def save_manifest(manifest, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def diff_manifest(manifest, files):
+    """
+    Separa files = [(caminho, label), ...] em (novas, antigas): novas são as
+    imagens ausentes do manifesto ou com conteúdo/label diferente.
+    """
+    conhecidos = manifest['files'] if manifest else {}
+    novas, antigas = [], []
+    for img_path, label in files:
+        anterior = conhecidos.get(os.path.abspath(img_path))
+        if anterior and anterior['label'] == label and anterior['sha1'] == file_sha1(img_path):
+            antigas.append((img_path, label))
+        else:
+            novas.append((img_path, label))
+    return novas, antigas
+
+
+def _patches_of(files, patch_size):
+    """
+    Patches e labels de uma lista de imagens (uint8).
+    """
+    X, y = [], []
+    for img_path, label in files:
+        img, erro = try_load_image(img_path)
+        if erro is not None:
+            print(f"[ERRO] Falha ao carregar {img_path}: {erro}")
+            continue
+        patches, _ = extract_patches(img, patch_size)
+        X.append(patches)
+        y.append(np.full(patches.shape[0], label, dtype=int))
+    if not X:
+        return np.zeros((0, patch_size[0], patch_size[1], 3), dtype=np.uint8), np.zeros(0, dtype=int)
+    return np.concatenate(X), np.concatenate(y)
+
+
+def fine_tune(model_path, files, patch_size=(32, 32), replay_ratio=1.0, epochs=20,
+              learning_rate=1e-4, validation_split=0.2, patience=5, seed=0):
+    """
+    Ajusta o modelo salvo só com as imagens novas desde o último treino
+    (segundo o manifesto ao lado do modelo), mais uma amostra de patches
+    das imagens antigas (replay_ratio x o número de patches novos) para o
+    modelo não esquecer o que já aprendeu. Salva o modelo e o manifesto.
+    Retorna o modelo ajustado, ou None se não havia nada novo.
+    """
+    from keras.models import load_model
+    from keras.optimizers import Adam
+
+    manifest_path = manifest_path_for(model_path)
+    manifest = load_manifest(manifest_path)
+    if manifest is None:
+        print(f"[AVISO] Manifesto não encontrado ({manifest_path}); todas as imagens contam como novas.")
+    elif tuple(manifest['patch_size']) != tuple(patch_size):
+        print("[ERRO] O modelo salvo foi treinado com outro patch_size; faça um treino completo.")
+        return None
+
+    novas, antigas = diff_manifest(manifest, files)
+    print(f"📂 {len(novas)} imagens novas/alteradas, {len(antigas)} já conhecidas pelo modelo.")
+    if not novas:
+        print("✅ Nada para ajustar.")
+        return None
+
+    X_novo, y_novo = _patches_of(novas, patch_size)
+    if X_novo.shape[0] == 0:
+        print("[ERRO] Nenhum patch foi gerado das imagens novas.")
+        return None
+
+    # Replay: decodifica só uma amostra das imagens antigas
+    n_replay = int(X_novo.shape[0] * replay_ratio)
+    X_old, y_old = X_novo[:0], y_novo[:0]
+    if n_replay and antigas:
+        amostra = random.Random(seed).sample(antigas, len(antigas))
+        partes_X, partes_y, total = [], [], 0
+        for item in amostra:
+            Xi, yi = _patches_of([item], patch_size)
+            partes_X.append(Xi)
+            partes_y.append(yi)
+            total += Xi.shape[0]
+            if total >= n_replay:
+                break
+        X_old, y_old = np.concatenate(partes_X), np.concatenate(partes_y)
+        idx = np.random.default_rng(seed).permutation(X_old.shape[0])[:n_replay]
+        X_old, y_old = X_old[idx], y_old[idx]
+
+    X = np.concatenate([X_novo, X_old])
+    y = np.concatenate([y_novo, y_old])
+    print(f"🧠 Ajustando com {X_novo.shape[0]} patches novos + {X_old.shape[0]} de replay...")
+
+    cnn = load_model(model_path)
+    cnn.compile(optimizer=Adam(learning_rate=learning_rate), loss=cnn.loss, metrics=['accuracy'])
+
+    idx_treino, idx_val = split_indices(X.shape[0], validation_split, seed)
+    # model_input: modelos antigos (sem Rescaling) ainda esperam float32 em [0, 1]
+    train = (model_input(cnn, X[idx_treino]), y[idx_treino])
+    validation = (model_input(cnn, X[idx_val]), y[idx_val]) if idx_val.size else None
+    fit_controlled(cnn, train, validation, epochs=epochs, batch_size=64, patience=patience)
+
+    cnn.save(model_path)
+    save_manifest(build_manifest(files, patch_size), manifest_path)
+    print(f"\n✅ Modelo ajustado salvo em: {model_path}")
+    return cnn
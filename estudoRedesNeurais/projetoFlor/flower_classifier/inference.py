@@ -0,0 +1,180 @@
+from collections import deque
+
+import numpy as np
+
+from cnn_model import model_input
+from dataset import patch_grid, patch_positions
+from instrumentation import stage
+
+
+def _take(chunks, n):
+    """
+    Remove e retorna os n primeiros itens de uma fila (deque) de arrays.
+    """
+    partes = []
+    while n:
+        a = chunks[0]
+        if a.shape[0] <= n:
+            partes.append(chunks.popleft())
+            n -= a.shape[0]
+        else:
+            partes.append(a[:n])
+            chunks[0] = a[n:]
+            n = 0
+    return np.concatenate(partes) if len(partes) > 1 else partes[0]
+
+
+def predict_batched(cnn, images, patch_size=(32, 32), batch_size=4096, stride=None, prefilter=None,
+                    metrics=None):
+    """
+    Motor de inferência em lote entre imagens.
+
+    Recebe um iterável de (nome, img) e junta os patches de várias imagens
+    em lotes de tamanho fixo, chamando o modelo uma vez por lote em vez de
+    uma vez por imagem. Gera (nome, img, positions, preds) na mesma ordem
+    de entrada, assim que todos os patches de uma imagem foram avaliados.
+
+    Os patches ficam na fila como visões da imagem (uma por linha da grade)
+    e só são copiados ao montar o lote final.
+
+    prefilter (ver prefilter.py) descarta patches de fundo antes da CNN.
+    metrics (instrumentation.Metrics) recebe o tempo de cada etapa.
+    """
+    stride = stride or patch_size
+    pendentes = deque()  # imagens aguardando scores: (nome, img, positions, n)
+    fila = deque()       # patches ainda não enviados ao modelo
+    na_fila = 0
+    scores = deque()     # scores já calculados e ainda não distribuídos
+    n_scores = 0
+
+    def roda_lote(n):
+        nonlocal na_fila, n_scores
+        with stage(metrics, "batch_assembly"):
+            lote = _take(fila, n)
+        na_fila -= n
+
+        preds = np.zeros(n, dtype='float32')
+        keep = None
+        if prefilter is not None:
+            # Patches rejeitados pelo pré-filtro recebem score 0 sem passar pela CNN
+            with stage(metrics, "prefilter"):
+                keep = prefilter.keep(lote)
+                lote = lote[keep]
+        if lote.shape[0]:
+            with stage(metrics, "normalize"):
+                lote = model_input(cnn, lote)  # no-op para modelos com Rescaling
+            with stage(metrics, "predict"):
+                p = cnn.predict(lote, batch_size=lote.shape[0], verbose=0).reshape(-1)
+            if keep is None:
+                preds = p
+            else:
+                preds[keep] = p
+            if metrics is not None:
+                metrics.count("predict_calls")
+        scores.append(preds)
+        n_scores += n
+
+    def entrega():
+        nonlocal n_scores
+        while pendentes and pendentes[0][3] <= n_scores:
+            nome, img, positions, n = pendentes.popleft()
+            preds = _take(scores, n) if n else np.zeros(0, dtype='float32')
+            n_scores -= n
+            yield nome, img, positions, preds
+
+    for nome, img in images:
+        with stage(metrics, "patch_extraction"):
+            grid = patch_grid(img, patch_size, stride)
+            positions = patch_positions(grid.shape, stride)
+        n = positions.shape[0]
+        if metrics is not None:
+            metrics.count("patches", n)
+        pendentes.append((nome, img, positions, n))
+        if n:
+            fila.extend(grid)  # cada item é uma linha da grade: (n_colunas, h, w, c)
+            na_fila += n
+
+        while na_fila >= batch_size:
+            roda_lote(batch_size)
+        yield from entrega()
+
+    if na_fila:
+        roda_lote(na_fila)
+    yield from entrega()
+
+
+def score_heatmap(fcn, img, patch_size=(32, 32), stride=4, dense=False):
+    """
+    Mapa de calor de flor para a imagem inteira usando a rede totalmente
+    convolucional (cnn_model.build_fcn_from_cnn).
+
+    Sem dense, o mapa tem passo = stride (o passo natural da rede). Com
+    dense=True, as stride x stride versões deslocadas da imagem vão juntas
+    num único lote e o resultado é intercalado num mapa de passo 1.
+    Retorna um array (n_linhas, n_colunas) com um score por janela válida.
+    """
+    ph, pw = patch_size
+    h, w = img.shape[:2]
+    if h < ph or w < pw:
+        return np.zeros((0, 0), dtype='float32')
+
+    x = model_input(fcn, img)
+    if not dense:
+        heat = fcn.predict(x[np.newaxis], verbose=0)[0, ..., 0]
+        return heat[:(h - ph) // stride + 1, :(w - pw) // stride + 1]
+
+    # Desloca a imagem em (dy, dx) e completa as bordas com zero; só as
+    # janelas inteiramente dentro da imagem original são aproveitadas.
+    pad = np.pad(x, ((0, stride - 1), (0, stride - 1), (0, 0)))
+    shifts = [(dy, dx) for dy in range(stride) for dx in range(stride)]
+    lote = np.stack([pad[dy:dy + h, dx:dx + w] for dy, dx in shifts])
+    heats = fcn.predict(lote, batch_size=len(shifts), verbose=0)[..., 0]
+
+    nh, nw = h - ph + 1, w - pw + 1
+    dense_map = np.empty((nh, nw), dtype='float32')
+    for (dy, dx), heat in zip(shifts, heats):
+        alvo = dense_map[dy::stride, dx::stride]
+        alvo[...] = heat[:alvo.shape[0], :alvo.shape[1]]
+    return dense_map
+
+
+def heatmap_detections(heatmap, step):
+    """
+    Converte um mapa de calor em (positions, preds), no mesmo formato
+    usado por desenha_contorno_unico. step = passo do mapa em pixels.
+    """
+    nh, nw = heatmap.shape
+    positions = patch_positions((nh, nw), (step, step))
+    return positions, heatmap.reshape(-1)
+
+
+def predict_heatmaps(fcn, images, patch_size=(32, 32), stride=4, dense=False, metrics=None):
+    """
+    Equivalente a predict_batched para a rede totalmente convolucional:
+    gera (nome, img, positions, preds) com uma passada por imagem.
+    """
+    step = 1 if dense else stride
+    for nome, img in images:
+        with stage(metrics, "predict"):
+            heat = score_heatmap(fcn, img, patch_size, stride, dense)
+        if metrics is not None:
+            metrics.count("patches", heat.size)
+            metrics.count("predict_calls")
+        positions, preds = heatmap_detections(heat, step)
+        yield nome, img, positions, preds
+
+
+def caixa_unica(positions, preds, patch_size, threshold=0.3):
+    """
+    Caixa (x0, y0, x1, y1) que envolve todos os patches com score >= threshold,
+    ou None se nenhum patch passar do threshold.
+    """
+    preds = np.asarray(preds).reshape(-1)
+    positions = np.asarray(positions).reshape(-1, 2)
+    flower = preds >= threshold
+    if not flower.any():
+        return None
+
+    min_i, min_j = positions[flower].min(axis=0)
+    max_i, max_j = positions[flower].max(axis=0)
+    return int(min_j), int(min_i), int(max_j) + patch_size[1], int(max_i) + patch_size[0]
@@ -0,0 +1,150 @@
+import cProfile
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+
+class Metrics:
+    """
+    Tempos por etapa e contadores de uma execução (treino ou predição).
+
+        metrics = Metrics()
+        with metrics.stage("predict"):
+            ...
+        metrics.count("images")
+        metrics.write_json("run.json")
+
+    profile=True liga o cProfile e trace_memory=True o tracemalloc durante
+    toda a execução (entre start() e stop()).
+    """
+
+    def __init__(self, profile=False, trace_memory=False):
+        self.stages = {}
+        self.counters = {}
+        self.profile = cProfile.Profile() if profile else None
+        self.trace_memory = trace_memory
+        self.peak_memory_mb = None
+        self._lock = threading.Lock()
+        self._inicio = None
+        self.wall_s = None
+
+    def start(self):
+        self._inicio = time.perf_counter()
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.profile is not None:
+            self.profile.enable()
+        return self
+
+    def stop(self):
+        if self.profile is not None:
+            self.profile.disable()
+        if self.trace_memory:
+            self.peak_memory_mb = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+        if self._inicio is not None:
+            self.wall_s = time.perf_counter() - self._inicio
+        return self
+
+    @contextmanager
+    def stage(self, name):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - inicio)
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            s = self.stages.setdefault(name, {'count': 0, 'total_s': 0.0, 'max_s': 0.0})
+            s['count'] += 1
+            s['total_s'] += seconds
+            s['max_s'] = max(s['max_s'], seconds)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self):
+        stages = {
+            nome: dict(s, mean_ms=s['total_s'] / s['count'] * 1000 if s['count'] else 0.0)
+            for nome, s in self.stages.items()
+        }
+        resumo = {'wall_s': self.wall_s, 'stages': stages, 'counters': dict(self.counters)}
+        imagens = self.counters.get('images')
+        if imagens:
+            resumo['patches_per_image'] = self.counters.get('patches', 0) / imagens
+            if self.wall_s:
+                resumo['images_per_s'] = imagens / self.wall_s
+        if self.peak_memory_mb is not None:
+            resumo['peak_memory_mb'] = self.peak_memory_mb
+        return resumo
+
+    def to_prometheus(self, prefix="flower_classifier"):
+        """
+        Resumo no formato texto do Prometheus (para node_exporter textfile).
+        """
+        linhas = [
+            f"# HELP {prefix}_stage_seconds_total Tempo total gasto em cada etapa.",
+            f"# TYPE {prefix}_stage_seconds_total counter",
+        ]
+        for nome, s in self.stages.items():
+            linhas.append(f'{prefix}_stage_seconds_total{{stage="{nome}"}} {s["total_s"]:.6f}')
+        linhas += [
+            f"# HELP {prefix}_stage_calls_total Número de execuções de cada etapa.",
+            f"# TYPE {prefix}_stage_calls_total counter",
+        ]
+        for nome, s in self.stages.items():
+            linhas.append(f'{prefix}_stage_calls_total{{stage="{nome}"}} {s["count"]}')
+        for nome, valor in self.counters.items():
+            linhas.append(f"# TYPE {prefix}_{nome}_total counter")
+            linhas.append(f"{prefix}_{nome}_total {valor}")
+        resumo = self.summary()
+        for chave in ('wall_s', 'images_per_s', 'patches_per_image', 'peak_memory_mb'):
+            if resumo.get(chave) is not None:
+                linhas.append(f"# TYPE {prefix}_{chave} gauge")
+                linhas.append(f"{prefix}_{chave} {resumo[chave]:.6f}")
+        return "\n".join(linhas) + "\n"
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def write_prometheus(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+
+    def write_profile(self, path):
+        if self.profile is not None:
+            self.profile.dump_stats(path)
+
+    def print_summary(self):
+        print("\n⏱️ Tempo por etapa:")
+        for nome, s in sorted(self.stages.items(), key=lambda kv: -kv[1]['total_s']):
+            print(f"  {nome:<18} {s['total_s']:8.3f}s  ({s['count']}x, máx {s['max_s'] * 1000:.1f} ms)")
+        resumo = self.summary()
+        if 'images_per_s' in resumo:
+            print(f"  {resumo['images_per_s']:.2f} imagens/s, {resumo['patches_per_image']:.0f} patches/imagem")
+
+
+def stage(metrics, name):
+    """
+    metrics.stage(name), ou um contexto vazio quando metrics é None.
+    """
+    return metrics.stage(name) if metrics is not None else nullcontext()
+
+
+def peak_rss_mb():
+    """
+    Pico de memória residente do processo (MB); None fora do Linux/macOS.
+    ru_maxrss vem em KB no Linux e em bytes no macOS.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
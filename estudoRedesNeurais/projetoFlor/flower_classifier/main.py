@@ -1,35 +1,52 @@
+import argparse
 import os
-import cv2
-import numpy as np
-from PIL import Image
-from tensorflow import keras
-from keras.models import load_model
-
-from dataset import load_images_from_folder, generate_patches
-from cnn_model import build_cnn
+import sys
+
+from cnn_model import build_cnn, build_fcn_from_cnn, total_stride
+from dataset import list_image_files, list_labeled_files, load_image
+from detection import DEFAULT_SCALES, detect_multiscale
+from drawing import draw_boxes, draw_rectangle, save_image
+from incremental import build_manifest, save_manifest, manifest_path_for, fine_tune
+from inference import predict_batched, predict_heatmaps, caixa_unica
+from instrumentation import Metrics, stage
+from patch_cache import dataset_key, load_patches_cached
+from pipeline import ordered_map, BackgroundWriter
+from prediction_cache import PredictionCache
+from prefilter import VarianceFilter, LinearFilter, evaluate_prefilter
+from streaming import make_patch_dataset
+from tflite_backend import TFLiteModel
+from training import fit_controlled, split_files, split_indices
+
+# TensorFlow/Keras e OpenCV só são importados nos caminhos que precisam deles
+# (treino, carga do .h5, exportação); ver startup_check.py.
+
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+FLOWERS_PATH = os.path.join(BASE_PATH, "images", "flowers")
+NON_FLOWERS_PATH = os.path.join(BASE_PATH, "images", "non_flowers")
+TEST_FOLDER = os.path.join(BASE_PATH, "images", "test")
+RESULTS_FOLDER = os.path.join(BASE_PATH, "results")
+MODEL_FOLDER = os.path.join(BASE_PATH, "model")
+MODEL_PATH = os.path.join(MODEL_FOLDER, "cnn_model.h5")
+TFLITE_PATH = os.path.join(MODEL_FOLDER, "cnn_model_int8.tflite")
+CACHE_FOLDER = os.path.join(BASE_PATH, "cache")
+CHECKPOINT_FOLDER = os.path.join(BASE_PATH, "checkpoints")
+PREDICTION_CACHE_FOLDER = os.path.join(CACHE_FOLDER, "predictions")
+TRAIN_SOURCES = [(FLOWERS_PATH, 1), (NON_FLOWERS_PATH, 0)]
+PATCH_SIZE = (32, 32)
+BATCH_SIZE_INFERENCIA = 4096  # patches por chamada ao modelo (somando várias imagens)
 
 
 def desenha_contorno_unico(img, patch_size, positions, preds, threshold=0.3):
     """
     Desenha um único retângulo ao redor da região que contém flores.
+    positions/preds podem vir do teste por patches ou de um mapa de calor.
     """
-    flower_indices = [idx for idx, p in enumerate(preds) if p >= threshold]
-    if not flower_indices:
+    caixa = caixa_unica(positions, preds, patch_size, threshold)
+    if caixa is None:
         return img
 
-    min_i = min(positions[idx][0] for idx in flower_indices)
-    min_j = min(positions[idx][1] for idx in flower_indices)
-    max_i = max(positions[idx][0] for idx in flower_indices)
-    max_j = max(positions[idx][1] for idx in flower_indices)
-
-    cv2.rectangle(
-        img,
-        (min_j, min_i),
-        (max_j + patch_size[1], max_i + patch_size[0]),
-        (255, 0, 255),
-        3
-    )
-    return img
+    return draw_rectangle(img, caixa, (255, 0, 255), 3)
 
 
 def menu(model_path):
@@ -41,87 +58,339 @@ def menu(model_path):
         print("[1] Treinar e SALVAR por cima do modelo atual")
         print("[2] Treinar mas NÃO salvar (modo temporário)")
         print("[3] Usar o modelo salvo (sem treinar)")
-        opcao = input("\nEscolha uma opção (1/2/3): ").strip()
+        print("[4] Treinar em streaming (pouca memória) e SALVAR por cima do modelo atual")
+        print("[5] Exportar o modelo salvo para TFLite (float16 e INT8)")
+        print("[6] Usar o modelo TFLite INT8 exportado (sem Keras)")
+        print("[7] Ajustar o modelo salvo só com as imagens novas (fine-tune)")
+        opcao = input("\nEscolha uma opção (1/2/3/4/5/6/7): ").strip()
         return opcao
     else:
         print("\n🚀 Nenhum modelo salvo encontrado.")
         print("[1] Treinar e SALVAR novo modelo")
         print("[2] Treinar mas NÃO salvar (modo temporário)")
-        opcao = input("\nEscolha uma opção (1/2): ").strip()
+        print("[4] Treinar em streaming (pouca memória) e SALVAR novo modelo")
+        opcao = input("\nEscolha uma opção (1/2/4): ").strip()
         return opcao
 
 
-def main():
-    base_path = os.path.dirname(os.path.abspath(__file__))
-    flowers_path = os.path.join(base_path, "images", "flowers")
-    non_flowers_path = os.path.join(base_path, "images", "non_flowers")
-    test_folder = os.path.join(base_path, "images", "test")
-    results_folder = os.path.join(base_path, "results")
-    model_folder = os.path.join(base_path, "model")
-    model_path = os.path.join(model_folder, "cnn_model.h5")
-    patch_size = (32, 32)
+def treinar(epochs, salvar=True, streaming=False, validation_split=0.2, patience=10,
+            time_budget=None, resume=True, metrics=None, batch_size=64, **arquitetura):
+    """
+    Treina a CNN nas pastas de flores/não flores e, se salvar=True,
+    grava o modelo em MODEL_PATH. Retorna o modelo (ou None em caso de erro).
+
+    Separa validation_split dos dados para validação, para quando val_loss
+    estabiliza (patience épocas) ou quando time_budget segundos acabam, e
+    salva checkpoints em CHECKPOINT_FOLDER para retomar um treino interrompido.
+    metrics (instrumentation.Metrics) recebe o tempo de cada etapa.
+    arquitetura = parâmetros extras de build_cnn (filters, dense_units,
+    optimizer, learning_rate), por exemplo os escolhidos com sweep.py.
+    """
+    cnn = build_cnn((PATCH_SIZE[0], PATCH_SIZE[1], 3), **arquitetura)
+
+    if streaming:
+        files_treino, files_val = split_files(list_labeled_files(TRAIN_SOURCES), validation_split)
+        if not files_treino:
+            print("[ERRO] Nenhuma imagem de treino encontrada.")
+            return None
+        train = make_patch_dataset(files_treino, PATCH_SIZE, batch_size=batch_size)
+        validation = make_patch_dataset(files_val, PATCH_SIZE, batch_size=256, shuffle=False) if files_val else None
+    else:
+        with stage(metrics, "load_patches"):
+            X, y = load_patches_cached(TRAIN_SOURCES, CACHE_FOLDER, PATCH_SIZE)
+        if X.shape[0] == 0:
+            print("[ERRO] Nenhum patch foi gerado (nenhuma imagem de treino encontrada?).")
+            return None
+        if metrics is not None:
+            metrics.count("patches", X.shape[0])
+
+        # Os patches seguem em uint8: a normalização é feita dentro do modelo
+        with stage(metrics, "split"):
+            idx_treino, idx_val = split_indices(X.shape[0], validation_split)
+            train = (X[idx_treino], y[idx_treino])
+            validation = (X[idx_val], y[idx_val]) if idx_val.size else None
+
+    # O checkpoint só é retomado com o mesmo dataset, divisão e arquitetura
+    dataset_id = f"{dataset_key(list_labeled_files(TRAIN_SOURCES), PATCH_SIZE)}:{streaming}:{validation_split}"
+    with stage(metrics, "fit"):
+        fit_controlled(cnn, train, validation, epochs=epochs, batch_size=batch_size, patience=patience,
+                       time_budget=time_budget, checkpoint_dir=CHECKPOINT_FOLDER if salvar else None,
+                       resume=resume, dataset_id=dataset_id)
+
+    if salvar:
+        os.makedirs(MODEL_FOLDER, exist_ok=True)
+        with stage(metrics, "save_model"):
+            cnn.save(MODEL_PATH)
+            # Manifesto com as imagens usadas, para o ajuste incremental (finetune)
+            save_manifest(build_manifest(list_labeled_files(TRAIN_SOURCES), PATCH_SIZE),
+                          manifest_path_for(MODEL_PATH))
+        print(f"\n✅ Modelo salvo em: {MODEL_PATH}")
+    else:
+        print("\n⚠️ Treinamento concluído, mas modelo não será salvo.")
+    return cnn
+
+
+def exportar():
+    """
+    Exporta o modelo salvo para TFLite (float16 e INT8) e grava o
+    relatório de acurácia em MODEL_FOLDER/tflite_report.json.
+    """
+    from keras.models import load_model
+    from tflite_export import export_tflite, sample_patches, accuracy_report, save_report
+
+    X, y = load_patches_cached(TRAIN_SOURCES, CACHE_FOLDER, PATCH_SIZE)
+    if X.shape[0] == 0:
+        print("[ERRO] Nenhum patch disponível para calibrar a quantização.")
+        return
+
+    keras_model = load_model(MODEL_PATH)
+    calib, _ = sample_patches(X, y, 500, seed=0)
+    paths = export_tflite(keras_model, MODEL_FOLDER, calib)
+
+    X_val, y_val = sample_patches(X, y, 2000, seed=1)
+    report = accuracy_report(keras_model, paths, X_val, y_val, keras_path=MODEL_PATH)
+    save_report(report, os.path.join(MODEL_FOLDER, "tflite_report.json"))
+    for nome in ('float16', 'int8'):
+        r = report[nome]
+        print(f"[OK] {nome}: {r['size_kb']:.0f} KB, acurácia {r['accuracy']:.4f} "
+              f"(delta {r['accuracy_delta']:+.4f}), {r['latency_ms_per_patch']:.3f} ms/patch")
+    for nome in ('keras', 'float16', 'int8'):
+        r = report[nome]
+        rss = f"{r['rss_mb']:.0f} MB" if r.get('rss_mb') is not None else "?"
+        print(f"    {nome}: carga {r['load_s']:.2f}s, pico de RSS {rss} (processo novo, "
+              f"{'com' if r['tensorflow_loaded'] else 'sem'} TensorFlow)")
+    if report['int8'].get('footprint_note'):
+        print("[AVISO] tflite_runtime não está instalado: o backend TFLite carregou o TensorFlow inteiro, "
+              "então carga e RSS não mostram o ganho do runtime leve (pip install tflite-runtime).")
+    print(f"✅ Modelos e relatório salvos em: {MODEL_FOLDER}")
+
+
+def caminho_modelo(backend="keras"):
+    return TFLITE_PATH if backend == "tflite" else MODEL_PATH
+
+
+def carregar_modelo(backend="keras"):
+    """
+    Carrega o modelo salvo: backend "keras" (.h5) ou "tflite" (INT8).
+    Retorna None se o arquivo não existir.
+    """
+    path = caminho_modelo(backend)
+    if not os.path.exists(path):
+        print(f"[ERRO] Modelo não encontrado: {path}")
+        return None
+
+    print(f"\n📦 Carregando modelo salvo ({backend})...")
+    if backend == "tflite":
+        cnn = TFLiteModel(path)
+    else:
+        from keras.models import load_model
+        cnn = load_model(path)
+    print("✅ Modelo carregado com sucesso.")
+    return cnn
+
+
+def testar_imagens(cnn, test_folder=TEST_FOLDER, results_folder=RESULTS_FOLDER,
+                   modo="patches", fcn_denso=False, batch_size=BATCH_SIZE_INFERENCIA, threshold=0.3,
+                   prefilter=None, metrics=None, decode_workers=4, write_workers=2, cache=None,
+                   scales=DEFAULT_SCALES, iou_threshold=0.3):
+    """
+    Roda o modelo nas imagens de test_folder e salva as imagens com o
+    contorno em results_folder.
+    modo = "patches" (lotes de patches) ou "fcn" (mapa de calor com a rede
+    convolucional; fcn_denso=True -> mapa com passo 1, só para modelo Keras)
+    ou "multiscale" (pirâmide com as escalas `scales`; uma caixa por região
+    detectada, com NMS em iou_threshold, em vez de uma caixa única).
+    prefilter = pré-filtro de fundo (prefilter.py), nos modos "patches" e "multiscale".
+    metrics (instrumentation.Metrics) recebe o tempo de cada etapa.
+
+    As etapas rodam em paralelo, com filas limitadas entre elas:
+    decode_workers threads decodificam as próximas imagens enquanto o modelo
+    avalia as atuais, e write_workers threads desenham e gravam os resultados
+    em segundo plano (o log continua na ordem das imagens).
+
+    cache (prediction_cache.PredictionCache): imagens já avaliadas com o
+    mesmo modelo e parâmetros não passam pela CNN; se o resultado gravado é
+    o dessa mesma entrada do cache, nem são decodificadas (senão o
+    resultado é redesenhado a partir dos scores salvos).
+    """
+    if not os.path.exists(test_folder):
+        print("[ERRO] Pasta de teste não encontrada.")
+        return
 
     os.makedirs(results_folder, exist_ok=True)
-    os.makedirs(model_folder, exist_ok=True)
+    print("\n🔍 Iniciando predições nas imagens de teste...\n")
 
-    # Menu inicial
-    opcao = menu(model_path)
+    def decodifica(img_path):
+        with stage(metrics, "decode"):
+            img = load_image(img_path)
+        if metrics is not None:
+            metrics.count("images")
+        return os.path.basename(img_path), img
+
+    arquivos = list_image_files(test_folder)
+    chaves = {}       # nome -> chave no cache
+    redesenhar = []   # (caminho, positions, preds) com scores do cache mas sem o resultado dessa entrada
+    gravados = []     # (chave, caminho do resultado) gravados nesta execução
+    if cache is not None:
+        a_avaliar = []
+        for img_path in arquivos:
+            nome = os.path.basename(img_path)
+            chave = chaves[nome] = cache.key(img_path)
+            salvo = cache.get(chave)
+            if salvo is None:
+                a_avaliar.append(img_path)
+            elif not cache.result_ok(chave, os.path.join(results_folder, f"resultado_{nome}")):
+                redesenhar.append((img_path, *salvo))
+        arquivos = a_avaliar
+
+    imagens = ordered_map(decodifica, arquivos, workers=decode_workers)
+
+    if modo == "fcn":
+        fcn = build_fcn_from_cnn(cnn)
+        resultados = predict_heatmaps(fcn, imagens, PATCH_SIZE, total_stride(cnn),
+                                      dense=fcn_denso, metrics=metrics)
+    elif modo == "multiscale":
+        # aqui (positions, preds) = (caixas, scores) de cada região detectada
+        resultados = detect_multiscale(cnn, imagens, scales, PATCH_SIZE, threshold, iou_threshold,
+                                       batch_size=batch_size, prefilter=prefilter, metrics=metrics)
+    else:
+        resultados = predict_batched(cnn, imagens, PATCH_SIZE, batch_size=batch_size,
+                                     prefilter=prefilter, metrics=metrics)
+
+    def registra(test_img_name, save_path):
+        # só depois de gravar: uma gravação que falhou não fica marcada como válida
+        if test_img_name in chaves:
+            gravados.append((chaves[test_img_name], save_path))
+
+    def grava(test_img_name, img, positions, preds):
+        save_path = os.path.join(results_folder, f"resultado_{test_img_name}")
+        if modo == "multiscale":
+            with stage(metrics, "draw"):
+                img = draw_boxes(img, positions, (255, 0, 255), 3)
+        elif len(positions) == 0:
+            # não deixa para trás um resultado de outra execução
+            if os.path.exists(save_path):
+                os.remove(save_path)
+            registra(test_img_name, save_path)
+            return f"[AVISO] Nenhum patch válido em {test_img_name}"
+        else:
+            with stage(metrics, "draw"):
+                img = desenha_contorno_unico(img, PATCH_SIZE, positions, preds, threshold=threshold)
+
+        with stage(metrics, "save"):
+            save_image(save_path, img)
+        registra(test_img_name, save_path)
+        return f"[OK] Resultado salvo em {save_path}"
+
+    def redesenha(img_path, positions, preds):
+        nome, img = decodifica(img_path)
+        return grava(nome, img, positions, preds)
+
+    with BackgroundWriter(workers=write_workers, max_pending=2 * write_workers) as writer:
+        for item in redesenhar:
+            writer.submit(redesenha, *item)
+        for resultado in resultados:
+            if cache is not None:
+                nome, _, positions, preds = resultado
+                cache.put(chaves[nome], positions, preds)
+            writer.submit(grava, *resultado)
+
+    if cache is not None:
+        for chave, save_path in gravados:
+            cache.set_result(chave, save_path)
+        cache.save()
+        print(f"\n💾 Cache de predições: {cache.hits} imagens reaproveitadas "
+              f"({len(redesenhar)} redesenhadas), {cache.misses} avaliadas pela CNN.")
+        if metrics is not None:
+            metrics.count("cache_hits", cache.hits)
+
+    if prefilter is not None:
+        print(f"\n🧹 Pré-filtro: {prefilter.rejected}/{prefilter.seen} patches rejeitados "
+              f"({prefilter.rejection_rate():.1%}) sem passar pela CNN.")
+        if metrics is not None:
+            metrics.count("patches_rejected", prefilter.rejected)
+    print(f"\n✅ Processamento finalizado. Resultados estão na pasta '{results_folder}'.")
+
+
+def criar_prefiltro(args, cnn):
+    """
+    Monta o pré-filtro escolhido na linha de comando (ou None). O filtro
+    linear é treinado nos patches de treino (do cache); com
+    --prefilter-report, mostra a rejeição e o efeito na acurácia nos
+    patches de validação, que ficam fora do treino do filtro.
+    """
+    if args.prefilter == "none":
+        return None
+    X = y = None
+    if args.prefilter == "linear" or args.prefilter_report:
+        X, y = load_patches_cached(TRAIN_SOURCES, CACHE_FOLDER, PATCH_SIZE)
+    if args.prefilter_report:
+        # mesma divisão de treinar(): a validação também ficou fora do treino da CNN
+        idx_treino, idx_val = split_indices(X.shape[0])
+    else:
+        idx_treino = idx_val = slice(None)
 
-    cnn = None
+    if args.prefilter == "variance":
+        prefilter = VarianceFilter(args.min_std)
+    else:
+        prefilter = LinearFilter(args.recall).fit(X[idx_treino], y[idx_treino])
 
-    # === Treinar e salvar ===
-    if opcao == "1":
-        print("\n🧠 Treinando modelo (será salvo após o treino)...")
-        flowers = load_images_from_folder(flowers_path, label=1)
-        non_flowers = load_images_from_folder(non_flowers_path, label=0)
-        all_images = flowers + non_flowers
+    if args.prefilter_report:
+        report = evaluate_prefilter(cnn, prefilter, X[idx_val], y[idx_val])
+        prefilter.seen = prefilter.rejected = 0
+        print(f"🧹 Pré-filtro ({args.prefilter}) em {report['n_patches']} patches de validação: "
+              f"rejeição {report['rejection_rate']:.1%}, flores rejeitadas {report['flowers_rejected']:.2%}, "
+              f"acurácia {report['accuracy_cnn']:.4f} -> {report['accuracy_prefilter']:.4f}")
+    return prefilter
 
-        if not all_images:
-            print("[ERRO] Nenhuma imagem encontrada para treino.")
-            return
 
-        X, y = generate_patches(all_images, patch_size)
-        if X.shape[0] == 0:
-            print("[ERRO] Nenhum patch foi gerado.")
-            return
+def main_interativo():
+    """
+    Fluxo original com menu (usado quando main.py roda sem argumentos).
+    """
+    os.makedirs(RESULTS_FOLDER, exist_ok=True)
+    os.makedirs(MODEL_FOLDER, exist_ok=True)
 
-        X = X.astype('float32') / 255.0
-        X = X.reshape(-1, patch_size[0], patch_size[1], 3)
+    # Menu inicial
+    opcao = menu(MODEL_PATH)
 
-        cnn = build_cnn((patch_size[0], patch_size[1], 3))
-        cnn.fit(X, y, epochs=500, batch_size=64, verbose=1)
+    modo_inferencia = "patches"   # "patches" ou "fcn" (mapa de calor com a rede convolucional)
+    cnn = None
 
-        cnn.save(model_path)
-        print(f"\n✅ Modelo salvo em: {model_path}")
+    # === Treinar e salvar ===
+    if opcao == "1":
+        print("\n🧠 Treinando modelo (será salvo após o treino)...")
+        cnn = treinar(epochs=500, salvar=True)
 
     # === Treinar sem salvar ===
     elif opcao == "2":
         print("\n🧠 Treinando modelo (modo temporário)...")
-        flowers = load_images_from_folder(flowers_path, label=1)
-        non_flowers = load_images_from_folder(non_flowers_path, label=0)
-        all_images = flowers + non_flowers
+        cnn = treinar(epochs=20, salvar=False)
 
-        if not all_images:
-            print("[ERRO] Nenhuma imagem encontrada para treino.")
-            return
+    # === Treinar em streaming e salvar ===
+    elif opcao == "4":
+        print("\n🧠 Treinando modelo em streaming (será salvo após o treino)...")
+        cnn = treinar(epochs=500, salvar=True, streaming=True)
 
-        X, y = generate_patches(all_images, patch_size)
-        if X.shape[0] == 0:
-            print("[ERRO] Nenhum patch foi gerado.")
-            return
+    # === Usar modelo salvo ===
+    elif opcao == "3" and os.path.exists(MODEL_PATH):
+        cnn = carregar_modelo("keras")
 
-        X = X.astype('float32') / 255.0
-        X = X.reshape(-1, patch_size[0], patch_size[1], 3)
+    # === Exportar para TFLite ===
+    elif opcao == "5" and os.path.exists(MODEL_PATH):
+        print("\n📦 Exportando modelo para TFLite...")
+        exportar()
+        return
 
-        cnn = build_cnn((patch_size[0], patch_size[1], 3))
-        cnn.fit(X, y, epochs=20, batch_size=64, verbose=1)
-        print("\n⚠️ Treinamento concluído, mas modelo não será salvo.")
+    # === Ajuste incremental ===
+    elif opcao == "7" and os.path.exists(MODEL_PATH):
+        cnn = fine_tune(MODEL_PATH, list_labeled_files(TRAIN_SOURCES), PATCH_SIZE)
+        if cnn is None:
+            return
 
-    # === Usar modelo salvo ===
-    elif opcao == "3" and os.path.exists(model_path):
-        print("\n📦 Carregando modelo salvo...")
-        cnn = load_model(model_path)
-        print("✅ Modelo carregado com sucesso.")
+    # === Usar modelo TFLite ===
+    elif opcao == "6":
+        cnn = carregar_modelo("tflite")
 
     else:
         print("[ERRO] Opção inválida. Encerrando.")
@@ -132,44 +401,206 @@ def main():
         print("[ERRO] Nenhum modelo disponível para testar.")
         return
 
-    if not os.path.exists(test_folder):
-        print("[ERRO] Pasta de teste não encontrada.")
-        return
+    testar_imagens(cnn, modo=modo_inferencia)
 
-    print("\n🔍 Iniciando predições nas imagens de teste...\n")
 
-    for test_img_name in os.listdir(test_folder):
-        if test_img_name.lower().endswith(('.png', '.jpg', '.jpeg')):
-            img_path = os.path.join(test_folder, test_img_name)
-            img = Image.open(img_path).convert('RGB')
-            img = np.array(img)
-
-            patches, positions = [], []
-            h, w = img.shape[:2]
-            for i in range(0, h - patch_size[0] + 1, patch_size[0]):
-                for j in range(0, w - patch_size[1] + 1, patch_size[1]):
-                    patch = img[i:i+patch_size[0], j:j+patch_size[1]]
-                    if patch.shape == (patch_size[0], patch_size[1], 3):
-                        patches.append(patch)
-                        positions.append((i, j))
-
-            if not patches:
-                print(f"[AVISO] Nenhum patch válido em {test_img_name}")
+def _add_metrics_args(p):
+    p.add_argument("--metrics-json", default=None, help="grava o resumo de tempos/contadores em JSON")
+    p.add_argument("--metrics-prom", default=None, help="grava o resumo no formato texto do Prometheus")
+    p.add_argument("--profile", default=None, help="grava um perfil cProfile (.prof) da execução")
+    p.add_argument("--trace-memory", action="store_true", help="mede o pico de memória com tracemalloc")
+
+
+def _emit_metrics(metrics, args):
+    metrics.stop()
+    metrics.print_summary()
+    if args.metrics_json:
+        metrics.write_json(args.metrics_json)
+        print(f"📊 Métricas (JSON) em {args.metrics_json}")
+    if args.metrics_prom:
+        metrics.write_prometheus(args.metrics_prom)
+        print(f"📊 Métricas (Prometheus) em {args.metrics_prom}")
+    if args.profile:
+        metrics.write_profile(args.profile)
+        print(f"📊 Perfil cProfile em {args.profile}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Classificador de flores por patches (sem argumentos abre o menu interativo)."
+    )
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("train", help="treina a CNN")
+    p.add_argument("--epochs", type=int, default=500)
+    p.add_argument("--no-save", action="store_true", help="não grava o modelo treinado")
+    p.add_argument("--streaming", action="store_true", help="treino em streaming (tf.data)")
+    p.add_argument("--val-split", type=float, default=0.2, help="fração dos dados para validação")
+    p.add_argument("--patience", type=int, default=10, help="épocas sem melhora de val_loss antes de parar")
+    p.add_argument("--time-budget", type=float, default=None, help="tempo máximo de treino (segundos)")
+    p.add_argument("--fresh", action="store_true", help="ignora checkpoints de um treino interrompido")
+    p.add_argument("--batch-size", type=int, default=64)
+    p.add_argument("--filters", type=int, nargs="+", default=[16, 32], help="filtros de cada bloco Conv2D")
+    p.add_argument("--dense-units", type=int, default=64, help="largura da camada Dense")
+    p.add_argument("--optimizer", default="adam")
+    p.add_argument("--lr", type=float, default=None, help="taxa de aprendizado (padrão do otimizador)")
+    _add_metrics_args(p)
+
+    p = sub.add_parser("finetune", help="ajusta o modelo salvo com as imagens novas desde o último treino")
+    p.add_argument("--epochs", type=int, default=20)
+    p.add_argument("--replay", type=float, default=1.0,
+                   help="patches antigos por patch novo (evita esquecer o que já foi aprendido)")
+    p.add_argument("--lr", type=float, default=1e-4, help="taxa de aprendizado do ajuste")
+
+    sub.add_parser("export", help="exporta o modelo salvo para TFLite float16/INT8")
+
+    p = sub.add_parser("predict", help="roda o modelo salvo numa pasta de imagens")
+    p.add_argument("--input", default=TEST_FOLDER)
+    p.add_argument("--output", default=RESULTS_FOLDER)
+    p.add_argument("--backend", choices=["keras", "tflite"], default="keras")
+    p.add_argument("--mode", choices=["patches", "fcn", "multiscale"], default="patches")
+    p.add_argument("--scales", type=float, nargs="+", default=list(DEFAULT_SCALES),
+                   help="no modo multiscale, escalas da pirâmide")
+    p.add_argument("--iou", type=float, default=0.3, help="no modo multiscale, IoU máximo entre detecções (NMS)")
+    p.add_argument("--dense", action="store_true", help="no modo fcn, mapa de calor com passo 1")
+    p.add_argument("--batch-size", type=int, default=BATCH_SIZE_INFERENCIA)
+    p.add_argument("--threshold", type=float, default=0.3)
+    p.add_argument("--prefilter", choices=["none", "variance", "linear"], default="none",
+                   help="descarta patches de fundo antes da CNN")
+    p.add_argument("--min-std", type=float, default=3.0, help="pré-filtro variance: desvio padrão mínimo")
+    p.add_argument("--recall", type=float, default=0.99, help="pré-filtro linear: recall mínimo de flores")
+    p.add_argument("--prefilter-report", action="store_true",
+                   help="mede rejeição e acurácia do pré-filtro nos patches de validação (fora do treino)")
+    p.add_argument("--decode-workers", type=int, default=4, help="threads decodificando imagens")
+    p.add_argument("--write-workers", type=int, default=2, help="threads desenhando/gravando resultados")
+    p.add_argument("--no-cache", action="store_true", help="não usa o cache de predições")
+    p.add_argument("--cache-size", type=int, default=10000, help="máximo de imagens no cache de predições")
+    _add_metrics_args(p)
+
+    p = sub.add_parser("predict-large", help="avalia imagens muito grandes por tiles, com memória limitada")
+    p.add_argument("images", nargs="+",
+                   help=".npy (H, W, 3) uint8 ou imagem que o PIL lê por partes (TIFF/BMP/PPM sem compressão); "
+                        "PNG/JPEG: converta antes com to-npy")
+    p.add_argument("--output", default=RESULTS_FOLDER)
+    p.add_argument("--backend", choices=["keras", "tflite"], default="keras")
+    p.add_argument("--tile-size", type=int, default=2048, help="lado de cada tile em pixels")
+    p.add_argument("--batch-size", type=int, default=BATCH_SIZE_INFERENCIA)
+    p.add_argument("--threshold", type=float, default=0.3)
+    _add_metrics_args(p)
+
+    p = sub.add_parser("to-npy", help="converte imagens para .npy cru (entrada do predict-large)")
+    p.add_argument("images", nargs="+")
+    p.add_argument("--output", default=None, help="pasta dos .npy (padrão: ao lado de cada imagem)")
+
+    p = sub.add_parser("serve", help="servidor HTTP com o modelo carregado uma única vez")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8000)
+    p.add_argument("--backend", choices=["keras", "tflite"], default="keras")
+    p.add_argument("--max-batch", type=int, default=32, help="máximo de imagens por micro-lote")
+    p.add_argument("--max-wait-ms", type=float, default=5.0, help="espera máxima para formar um micro-lote")
+    p.add_argument("--threshold", type=float, default=0.3)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.comando == "train":
+        metrics = Metrics(profile=bool(args.profile), trace_memory=args.trace_memory).start()
+        treinar(args.epochs, salvar=not args.no_save, streaming=args.streaming,
+                validation_split=args.val_split, patience=args.patience,
+                time_budget=args.time_budget, resume=not args.fresh, metrics=metrics,
+                batch_size=args.batch_size, filters=tuple(args.filters), dense_units=args.dense_units,
+                optimizer=args.optimizer, learning_rate=args.lr)
+        _emit_metrics(metrics, args)
+
+    elif args.comando == "finetune":
+        if not os.path.exists(MODEL_PATH):
+            print(f"[ERRO] Modelo não encontrado: {MODEL_PATH}")
+            return 1
+        fine_tune(MODEL_PATH, list_labeled_files(TRAIN_SOURCES), PATCH_SIZE,
+                  replay_ratio=args.replay, epochs=args.epochs, learning_rate=args.lr)
+
+    elif args.comando == "export":
+        if not os.path.exists(MODEL_PATH):
+            print(f"[ERRO] Modelo não encontrado: {MODEL_PATH}")
+            return 1
+        exportar()
+
+    elif args.comando == "predict":
+        if args.mode == "fcn" and args.backend != "keras":
+            print("[ERRO] O modo fcn precisa do backend keras.")
+            return 1
+        metrics = Metrics(profile=bool(args.profile), trace_memory=args.trace_memory).start()
+        with metrics.stage("load_model"):
+            cnn = carregar_modelo(args.backend)
+        if cnn is None:
+            return 1
+        prefilter = criar_prefiltro(args, cnn)
+        cache = None
+        if not args.no_cache:
+            cache = PredictionCache(
+                PREDICTION_CACHE_FOLDER, caminho_modelo(args.backend), max_entries=args.cache_size,
+                patch_size=PATCH_SIZE, threshold=args.threshold, mode=args.mode, dense=args.dense,
+                prefilter=args.prefilter, min_std=args.min_std, recall=args.recall,
+                scales=args.scales, iou=args.iou,
+            )
+        testar_imagens(cnn, args.input, args.output, modo=args.mode, fcn_denso=args.dense,
+                       batch_size=args.batch_size, threshold=args.threshold, prefilter=prefilter,
+                       metrics=metrics, decode_workers=args.decode_workers,
+                       write_workers=args.write_workers, cache=cache,
+                       scales=tuple(args.scales), iou_threshold=args.iou)
+        _emit_metrics(metrics, args)
+
+    elif args.comando == "predict-large":
+        from tiles import score_tiled, save_tiled_result
+
+        metrics = Metrics(profile=bool(args.profile), trace_memory=args.trace_memory).start()
+        with metrics.stage("load_model"):
+            cnn = carregar_modelo(args.backend)
+        if cnn is None:
+            return 1
+        for img_path in args.images:
+            if not os.path.exists(img_path):
+                print(f"[ERRO] Imagem não encontrada: {img_path}")
                 continue
+            try:
+                caixa, grade = score_tiled(cnn, img_path, PATCH_SIZE, tile_size=args.tile_size,
+                                           batch_size=args.batch_size, threshold=args.threshold,
+                                           metrics=metrics)
+            except ValueError as e:
+                print(f"[ERRO] {e}")
+                continue
+            metrics.count("images")
+            save_tiled_result(args.output, img_path, caixa, grade)
+            print(f"✅ {os.path.basename(img_path)}: caixa {caixa}, grade de scores {grade.shape}")
+        _emit_metrics(metrics, args)
 
-            patches = np.array(patches).astype('float32') / 255.0
-            preds = cnn.predict(patches, verbose=0).flatten()
+    elif args.comando == "to-npy":
+        from tiles import to_npy
 
-            img = desenha_contorno_unico(img, patch_size, positions, preds, threshold=0.3)
-            img = img.astype(np.uint8)
-            img_bgr = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+        for img_path in args.images:
+            if not os.path.exists(img_path):
+                print(f"[ERRO] Imagem não encontrada: {img_path}")
+                continue
+            pasta = args.output or os.path.dirname(os.path.abspath(img_path))
+            os.makedirs(pasta, exist_ok=True)
+            out_path = os.path.join(pasta, os.path.splitext(os.path.basename(img_path))[0] + ".npy")
+            to_npy(img_path, out_path)
+            print(f"[OK] {img_path} -> {out_path}")
 
-            save_path = os.path.join(results_folder, f"resultado_{test_img_name}")
-            cv2.imwrite(save_path, img_bgr)
-            print(f"[OK] Resultado salvo em {save_path}")
+    elif args.comando == "serve":
+        from server import serve
 
-    print("\n✅ Processamento finalizado. Resultados estão na pasta 'results/'.")
+        cnn = carregar_modelo(args.backend)
+        if cnn is None:
+            return 1
+        serve(cnn, args.host, args.port, PATCH_SIZE, max_batch=args.max_batch,
+              max_wait_ms=args.max_wait_ms, threshold=args.threshold)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        sys.exit(main())
+    main_interativo()
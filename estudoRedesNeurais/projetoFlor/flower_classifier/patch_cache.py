@@ -0,0 +1,146 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from dataset import list_labeled_files, extract_patches, try_load_image
+
+
+def file_sha1(path):
+    """
+    Hash SHA-1 do conteúdo de um arquivo.
+    """
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _file_key(img_path, patch_size, stride, hash_content):
+    """
+    Chave de cache de uma imagem: caminho + (mtime, tamanho) ou hash do
+    conteúdo, junto com patch_size e stride.
+    """
+    h = hashlib.sha1()
+    h.update(os.path.abspath(img_path).encode())
+    if hash_content:
+        h.update(file_sha1(img_path).encode())
+    else:
+        st = os.stat(img_path)
+        h.update(f"{st.st_mtime_ns}:{st.st_size}".encode())
+    h.update(f"{tuple(patch_size)}:{tuple(stride)}".encode())
+    return h.hexdigest()
+
+
+def _dataset_key(entradas):
+    return hashlib.sha1("|".join(f"{k}:{label}" for _, label, k in entradas).encode()).hexdigest()
+
+
+def dataset_key(files, patch_size=(32, 32), stride=None, hash_content=False):
+    """
+    Chave de um dataset: muda se alguma imagem, label, patch_size ou stride
+    mudar. files = [(caminho, label), ...]. É a mesma chave do nome do
+    dataset_<chave>_X.npy gerado por load_patches_cached.
+    """
+    stride = stride or patch_size
+    return _dataset_key([(p, label, _file_key(p, patch_size, stride, hash_content)) for p, label in files])
+
+
+def _save_npy(path, array):
+    """
+    Grava um .npy de forma atômica (arquivo temporário + rename).
+    """
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def load_patches_cached(sources, cache_dir, patch_size=(32, 32), stride=None, hash_content=False,
+                        workers=None):
+    """
+    Gera X (patches) e y (labels) usando um cache em disco de arquivos .npy.
+
+    sources = [(pasta, label), ...]. Cada imagem tem seus patches salvos em
+    cache_dir/img_<chave>.npy; o dataset completo fica em
+    cache_dir/dataset_<chave>_X.npy / _y.npy e é aberto com mmap (sem ler
+    tudo para a memória). Só imagens novas ou alteradas são decodificadas,
+    em paralelo por workers threads.
+    """
+    stride = stride or patch_size
+    os.makedirs(cache_dir, exist_ok=True)
+
+    entradas = [  # (caminho, label, chave)
+        (img_path, label, _file_key(img_path, patch_size, stride, hash_content))
+        for img_path, label in list_labeled_files(sources)
+    ]
+
+    chave = _dataset_key(entradas)
+    x_path = os.path.join(cache_dir, f"dataset_{chave}_X.npy")
+    y_path = os.path.join(cache_dir, f"dataset_{chave}_y.npy")
+
+    if os.path.exists(x_path) and os.path.exists(y_path):
+        print(f"[CACHE] Dataset sem alterações ({len(entradas)} imagens), usando cache.")
+        return np.load(x_path, mmap_mode='r'), np.load(y_path)
+
+    # Patches por imagem: só decodifica (em paralelo) o que não está no cache
+    def img_cache(key):
+        return os.path.join(cache_dir, f"img_{key}.npy")
+
+    faltando = [(img_path, key) for img_path, _, key in entradas if not os.path.exists(img_cache(key))]
+
+    def gera(item):
+        img_path, key = item
+        img, erro = try_load_image(img_path)
+        if erro is None:
+            patches, _ = extract_patches(img, patch_size, stride)
+            _save_npy(img_cache(key), patches)
+        return erro
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        falhas = {}
+        for (img_path, key), erro in zip(faltando, pool.map(gera, faltando)):
+            if erro is not None:
+                print(f"[ERRO] Falha ao carregar {img_path}: {erro}")
+                falhas[key] = erro
+
+    blocos = [
+        (np.load(img_cache(key), mmap_mode='r'), label)
+        for _, label, key in entradas if key not in falhas
+    ]
+    reusadas = len(entradas) - len(faltando)
+    geradas = len(faltando) - len(falhas)
+    erros = len(falhas)
+
+    print(f"[CACHE] {reusadas} imagens do cache, {geradas} reprocessadas, {erros} com erro.")
+
+    # Monta o dataset direto num arquivo mapeado em memória
+    total = sum(p.shape[0] for p, _ in blocos)
+    if total == 0:
+        return np.zeros((0, patch_size[0], patch_size[1], 3), dtype=np.uint8), np.zeros(0, dtype=int)
+
+    tmp_x = x_path + ".tmp"
+    X = np.lib.format.open_memmap(tmp_x, mode='w+', dtype=np.uint8,
+                                  shape=(total, patch_size[0], patch_size[1], 3))
+    y = np.empty(total, dtype=int)
+    k = 0
+    for patches, label in blocos:
+        n = patches.shape[0]
+        X[k:k+n] = patches
+        y[k:k+n] = label
+        k += n
+    X.flush()
+    del X
+    os.replace(tmp_x, x_path)
+    _save_npy(y_path, y)
+
+    # Remove entradas que não pertencem mais ao dataset atual
+    validos = {f"img_{k}.npy" for _, _, k in entradas}
+    validos.update({os.path.basename(x_path), os.path.basename(y_path)})
+    for nome in os.listdir(cache_dir):
+        if nome.endswith(".npy") and nome not in validos:
+            os.remove(os.path.join(cache_dir, nome))
+
+    return np.load(x_path, mmap_mode='r'), y
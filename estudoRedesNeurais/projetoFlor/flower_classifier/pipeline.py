@@ -0,0 +1,71 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def ordered_map(func, items, workers=4, prefetch=None):
+    """
+    Aplica func aos itens num pool de threads e gera os resultados na ordem
+    de entrada. No máximo `prefetch` itens ficam em processamento/prontos
+    ao mesmo tempo (fila limitada): se quem consome atrasa, os workers param.
+    """
+    prefetch = prefetch or 2 * workers
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pendentes = deque()
+        for item in items:
+            pendentes.append(pool.submit(func, item))
+            if len(pendentes) >= prefetch:
+                yield pendentes.popleft().result()
+        while pendentes:
+            yield pendentes.popleft().result()
+
+
+class BackgroundWriter:
+    """
+    Pool de threads para gravar resultados em segundo plano.
+
+    submit() bloqueia quando já há max_pending tarefas na fila
+    (backpressure). As mensagens de log de cada tarefa são impressas na
+    ordem de envio, não na ordem em que as gravações terminam.
+    """
+
+    def __init__(self, workers=2, max_pending=8):
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._vagas = threading.Semaphore(max_pending)
+        self._futuros = deque()
+        self.erros = 0
+
+    def submit(self, func, *args):
+        """
+        Agenda func(*args); func pode devolver uma mensagem para o log.
+        """
+        self._vagas.acquire()
+        futuro = self._pool.submit(func, *args)
+        futuro.add_done_callback(lambda _: self._vagas.release())
+        self._futuros.append(futuro)
+        self._log_prontos()
+
+    def _log_prontos(self, esperar=False):
+        while self._futuros and (esperar or self._futuros[0].done()):
+            futuro = self._futuros.popleft()
+            try:
+                mensagem = futuro.result()
+            except Exception as e:
+                self.erros += 1
+                print(f"[ERRO] Falha ao gravar resultado: {e}")
+                continue
+            if mensagem:
+                print(mensagem)
+
+    def close(self):
+        """
+        Espera todas as gravações terminarem.
+        """
+        self._log_prontos(esperar=True)
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+from patch_cache import file_sha1
+
+
+class PredictionCache:
+    """
+    Cache em disco dos scores de cada imagem, endereçado por conteúdo.
+
+    A chave junta o hash da imagem, o hash do arquivo do modelo e os
+    parâmetros da predição (patch_size, threshold, modo...). Cada entrada é
+    um .npz com (positions, preds) em cache_dir; o índice (index.json)
+    guarda a ordem de uso para descartar as entradas mais antigas (LRU)
+    quando passar de max_entries.
+
+    Cada modelo (hash do arquivo) tem sua subpasta em cache_dir, então
+    alternar entre backends (.h5 e .tflite) ou modelos não apaga o cache do
+    outro; só as subpastas dos max_models modelos usados mais recentemente
+    são mantidas. max_entries vale também ao abrir o cache (ex.: depois de
+    reduzir --cache-size).
+
+    Cada entrada também guarda o arquivo de resultado desenhado com ela e o
+    hash desse arquivo (set_result): outra execução com outros parâmetros
+    grava por cima do mesmo resultado_<nome>, e result_ok detecta isso.
+    """
+
+    def __init__(self, cache_dir, model_path, max_entries=10000, max_models=4, **params):
+        self.max_entries = max_entries
+        self.model_hash = file_sha1(model_path)
+        self.cache_dir = os.path.join(cache_dir, f"model_{self.model_hash[:16]}")
+        self.params = json.dumps(params, sort_keys=True, default=str)
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._index_path = os.path.join(self.cache_dir, "index.json")
+        self._index = {}
+        if os.path.exists(self._index_path):
+            with open(self._index_path, encoding='utf-8') as f:
+                self._index = json.load(f)
+        self._relogio = max((e['used'] for e in self._index.values()), default=0)
+
+        self._limita()
+        self.save()   # marca esta subpasta como a usada mais recentemente
+        self._remove_modelos_antigos(cache_dir, max_models)
+
+    @staticmethod
+    def _remove_modelos_antigos(cache_dir, max_models):
+        pastas = [os.path.join(cache_dir, p) for p in os.listdir(cache_dir) if p.startswith("model_")]
+        pastas.sort(key=os.path.getmtime, reverse=True)
+        for pasta in pastas[max_models:]:
+            shutil.rmtree(pasta, ignore_errors=True)
+        if pastas[max_models:]:
+            print(f"🗑️ Cache de predições: {len(pastas) - max_models} modelos antigos removidos.")
+
+    def key(self, img_path):
+        """
+        Chave de uma imagem (hash do conteúdo + modelo + parâmetros).
+        """
+        h = hashlib.sha1()
+        h.update(file_sha1(img_path).encode())
+        h.update(self.model_hash.encode())
+        h.update(self.params.encode())
+        return h.hexdigest()
+
+    def _entry_path(self, chave):
+        return os.path.join(self.cache_dir, f"pred_{chave}.npz")
+
+    def get(self, chave):
+        """
+        (positions, preds) salvos para a chave, ou None.
+        """
+        if chave not in self._index or not os.path.exists(self._entry_path(chave)):
+            self.misses += 1
+            return None
+        with np.load(self._entry_path(chave)) as dados:
+            resultado = dados['positions'], dados['preds']
+        self._toca(chave)
+        self.hits += 1
+        return resultado
+
+    def put(self, chave, positions, preds):
+        tmp = self._entry_path(chave) + ".tmp"
+        with open(tmp, 'wb') as f:
+            np.savez(f, positions=positions, preds=preds)
+        os.replace(tmp, self._entry_path(chave))
+        self._index[chave] = {'model': self.model_hash}
+        self._toca(chave)
+        self._limita()
+
+    def _limita(self):
+        """
+        Descarta as entradas menos usadas além de max_entries (LRU).
+        """
+        excesso = len(self._index) - self.max_entries
+        if excesso > 0:
+            for antiga in sorted(self._index, key=lambda k: self._index[k]['used'])[:excesso]:
+                self._remove(antiga)
+
+    def set_result(self, chave, result_path):
+        """
+        Registra que result_path foi gravado a partir da entrada `chave`
+        (result_path inexistente = a entrada não gera arquivo).
+        """
+        if chave not in self._index:
+            return
+        sha1 = file_sha1(result_path) if os.path.exists(result_path) else None
+        self._index[chave].update(result_path=os.path.abspath(result_path), result_sha1=sha1)
+
+    def result_ok(self, chave, result_path):
+        """
+        True se result_path é exatamente o que a entrada `chave` gravou.
+        """
+        entrada = self._index.get(chave, {})
+        if entrada.get('result_path') != os.path.abspath(result_path):
+            return False
+        if not os.path.exists(result_path):
+            return entrada.get('result_sha1') is None
+        return entrada.get('result_sha1') == file_sha1(result_path)
+
+    def _toca(self, chave):
+        self._relogio += 1
+        self._index[chave]['used'] = self._relogio
+
+    def _remove(self, chave):
+        self._index.pop(chave, None)
+        try:
+            os.remove(self._entry_path(chave))
+        except FileNotFoundError:
+            pass
+
+    def save(self):
+        """
+        Grava o índice (chamar ao fim da execução).
+        """
+        self._limita()
+        tmp = self._index_path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f)
+        os.replace(tmp, self._index_path)
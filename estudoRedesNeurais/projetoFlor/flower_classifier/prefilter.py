@@ -0,0 +1,122 @@
+import numpy as np
+
+from cnn_model import model_input
+
+
+def patch_features(patches):
+    """
+    Atributos baratos por patch (vetorizado): média e desvio padrão de cada
+    canal e energia média do gradiente horizontal/vertical. Retorna (N, 8).
+    """
+    x = np.asarray(patches, dtype='float32')
+    media = x.mean(axis=(1, 2))
+    desvio = x.std(axis=(1, 2))
+    gy = np.abs(np.diff(x, axis=1)).mean(axis=(1, 2, 3))
+    gx = np.abs(np.diff(x, axis=2)).mean(axis=(1, 2, 3))
+    return np.column_stack([media, desvio, gy, gx])
+
+
+class _Counter:
+    """
+    Contagem de patches vistos/rejeitados pelo pré-filtro.
+    """
+
+    def __init__(self):
+        self.seen = 0
+        self.rejected = 0
+
+    def _conta(self, keep):
+        self.seen += keep.size
+        self.rejected += int(keep.size - keep.sum())
+        return keep
+
+    def rejection_rate(self):
+        return self.rejected / self.seen if self.seen else 0.0
+
+
+class VarianceFilter(_Counter):
+    """
+    Rejeita patches quase uniformes (céu, paredes): desvio padrão dos
+    pixels (0-255) menor que min_std.
+    """
+
+    def __init__(self, min_std=3.0):
+        super().__init__()
+        self.min_std = min_std
+
+    def keep(self, patches):
+        """
+        Máscara booleana: True = o patch segue para a CNN.
+        """
+        x = np.asarray(patches, dtype='float32')
+        return self._conta(x.reshape(x.shape[0], -1).std(axis=1) >= self.min_std)
+
+
+class LinearFilter(_Counter):
+    """
+    Classificador linear (regressão logística) sobre patch_features, treinado
+    nos mesmos patches de generate_patches. O limiar é escolhido para manter
+    pelo menos `recall` dos patches de flor. Precisa de fit antes de keep.
+    """
+
+    def __init__(self, recall=0.99):
+        super().__init__()
+        self.recall = recall
+        self.mu = None
+        self.sigma = None
+        self.w = None
+        self.b = 0.0
+        self.threshold = 0.0
+
+    def _score(self, feats):
+        if self.w is None:
+            raise RuntimeError("LinearFilter não treinado: chame fit(X, y) antes de keep().")
+        return (feats - self.mu) / self.sigma @ self.w + self.b
+
+    def fit(self, X, y, epochs=200, learning_rate=0.5):
+        feats = patch_features(X)
+        y = np.asarray(y, dtype='float32')
+        self.mu = feats.mean(axis=0)
+        self.sigma = feats.std(axis=0) + 1e-6
+        self.w = np.zeros(feats.shape[1], dtype='float32')
+        self.b = 0.0
+
+        # gradiente descendente em lote completo (poucos atributos, é rápido)
+        for _ in range(epochs):
+            z = self._score(feats)
+            p = 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+            erro = p - y
+            self.w -= learning_rate * ((feats - self.mu) / self.sigma).T @ erro / y.size
+            self.b -= learning_rate * float(erro.mean())
+
+        scores_flor = self._score(feats[y == 1])
+        if scores_flor.size:
+            self.threshold = float(np.quantile(scores_flor, 1.0 - self.recall))
+        return self
+
+    def keep(self, patches):
+        return self._conta(self._score(patch_features(patches)) >= self.threshold)
+
+
+def evaluate_prefilter(cnn, prefilter, X, y, threshold=0.5, batch_size=4096):
+    """
+    Compara a CNN sozinha com pré-filtro + CNN nos mesmos patches (uint8):
+    taxa de rejeição, acurácia com e sem filtro e flores perdidas pelo filtro.
+    """
+    X = np.asarray(X)
+    y = np.asarray(y)
+    preds = np.concatenate([
+        cnn.predict(model_input(cnn, X[k:k + batch_size]), verbose=0).reshape(-1)
+        for k in range(0, X.shape[0], batch_size)
+    ]) if X.shape[0] else np.zeros(0)
+
+    keep = prefilter.keep(X)
+    filtrado = np.where(keep, preds, 0.0)
+    flores = y == 1
+    return {
+        'n_patches': int(X.shape[0]),
+        'rejection_rate': float(1.0 - keep.mean()) if keep.size else 0.0,
+        'accuracy_cnn': float(np.mean((preds >= threshold) == y)),
+        'accuracy_prefilter': float(np.mean((filtrado >= threshold) == y)),
+        'flowers_rejected': float(np.mean(~keep[flores])) if flores.any() else 0.0,
+    }
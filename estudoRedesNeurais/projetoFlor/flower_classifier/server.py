@@ -0,0 +1,165 @@
+import io
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from PIL import Image
+
+from dataset import load_image
+from inference import predict_batched, caixa_unica
+
+
+class LatencyStats:
+    """
+    Guarda as últimas latências (ms) e calcula p50/p99.
+    """
+
+    def __init__(self, maxlen=10000):
+        self._valores = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def add(self, ms):
+        with self._lock:
+            self._valores.append(ms)
+            self.total += 1
+
+    def summary(self):
+        with self._lock:
+            valores = np.array(self._valores, dtype='float64')
+            total = self.total
+        if valores.size == 0:
+            return {'count': total, 'p50_ms': None, 'p99_ms': None}
+        p50, p99 = np.percentile(valores, [50, 99])
+        return {'count': total, 'p50_ms': float(p50), 'p99_ms': float(p99)}
+
+
+class MicroBatcher:
+    """
+    Junta requisições concorrentes num micro-lote (até max_batch imagens ou
+    max_wait_ms de espera) e avalia todas com uma passada de predict_batched.
+    """
+
+    def __init__(self, cnn, patch_size=(32, 32), max_batch=32, max_wait_ms=5.0, threshold=0.3):
+        self.cnn = cnn
+        self.patch_size = patch_size
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.threshold = threshold
+        self._fila = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, img):
+        """
+        Enfileira uma imagem RGB e retorna um Future com o resultado.
+        """
+        futuro = Future()
+        self._fila.put((img, futuro))
+        return futuro
+
+    def _loop(self):
+        while True:
+            lote = [self._fila.get()]
+            limite = time.perf_counter() + self.max_wait
+            while len(lote) < self.max_batch:
+                resta = limite - time.perf_counter()
+                if resta <= 0:
+                    break
+                try:
+                    lote.append(self._fila.get(timeout=resta))
+                except queue.Empty:
+                    break
+
+            try:
+                imagens = ((k, img) for k, (img, _) in enumerate(lote))
+                for k, _, positions, preds in predict_batched(self.cnn, imagens, self.patch_size,
+                                                              batch_size=4096):
+                    caixa = caixa_unica(positions, preds, self.patch_size, self.threshold)
+                    lote[k][1].set_result({
+                        'box': list(caixa) if caixa else None,
+                        'max_score': float(preds.max()) if len(preds) else None,
+                        'n_patches': int(len(preds)),
+                        'batch_images': len(lote),
+                    })
+            except Exception as e:
+                for _, futuro in lote:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+
+
+def _handler(batcher, stats):
+    class Handler(BaseHTTPRequestHandler):
+        def _json(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == '/stats':
+                self._json(200, stats.summary())
+            elif self.path == '/health':
+                self._json(200, {'status': 'ok'})
+            else:
+                self._json(404, {'error': 'rota não encontrada'})
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._json(404, {'error': 'rota não encontrada'})
+                return
+
+            inicio = time.perf_counter()
+            corpo = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            try:
+                # JSON {"path": "..."} ou os bytes da imagem direto no corpo
+                if self.headers.get('Content-Type', '').startswith('application/json'):
+                    img = load_image(json.loads(corpo)['path'])
+                else:
+                    img = np.array(Image.open(io.BytesIO(corpo)).convert('RGB'))
+            except Exception as e:
+                self._json(400, {'error': f"imagem inválida: {e}"})
+                return
+
+            try:
+                resultado = batcher.submit(img).result()
+            except Exception as e:
+                self._json(500, {'error': str(e)})
+                return
+
+            ms = (time.perf_counter() - inicio) * 1000
+            stats.add(ms)
+            resultado['latency_ms'] = ms
+            self._json(200, resultado)
+
+        def log_message(self, format, *args):
+            pass  # sem uma linha de log por requisição
+
+    return Handler
+
+
+def serve(cnn, host="127.0.0.1", port=8000, patch_size=(32, 32), max_batch=32, max_wait_ms=5.0,
+          threshold=0.3):
+    """
+    Servidor HTTP com o modelo já carregado.
+    POST /predict  -> {"box": [x0, y0, x1, y1] | null, "max_score", ...}
+    GET  /stats    -> {"count", "p50_ms", "p99_ms"}
+    """
+    batcher = MicroBatcher(cnn, patch_size, max_batch, max_wait_ms, threshold)
+    stats = LatencyStats()
+    httpd = ThreadingHTTPServer((host, port), _handler(batcher, stats))
+    print(f"🌐 Servidor ouvindo em http://{host}:{port} (POST /predict, GET /stats)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        print(f"\n📊 Latência: {stats.summary()}")
@@ -0,0 +1,74 @@
+"""
+Mede o tempo de inicialização do flower_classifier e confere o orçamento.
+
+Cada medida roda num processo Python novo (import frio). Falha (código 1)
+se algum tempo passar do orçamento ou se um framework pesado for
+importado sem necessidade.
+
+    python startup_check.py [--budget 1.0] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+
+# Módulos que não devem ser carregados só por importar o pacote
+HEAVY_MODULES = ("tensorflow", "keras", "cv2")
+
+CHECKS = {
+    "import main": "import main",
+    "main --help": "import sys, main; sys.argv = ['main.py', '--help']\ntry:\n    main.main()\nexcept SystemExit:\n    pass",
+    "import server": "import server",
+}
+
+
+def _run(code):
+    inicio = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=BASE_PATH, check=True,
+                   stdout=subprocess.DEVNULL)
+    return time.perf_counter() - inicio
+
+
+def heavy_modules_loaded(module="main"):
+    """
+    Lista os frameworks pesados presentes em sys.modules após importar module.
+    """
+    code = (f"import sys, {module}; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=BASE_PATH, check=True,
+                         capture_output=True, text=True).stdout.strip()
+    return [m for m in out.split(",") if m]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Orçamento de tempo de inicialização.")
+    parser.add_argument("--budget", type=float, default=1.0, help="segundos (mediana) por verificação")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    ok = True
+    base = statistics.median(_run("pass") for _ in range(args.runs))
+    print(f"Interpretador vazio: {base:.3f}s")
+
+    for nome, code in CHECKS.items():
+        t = statistics.median(_run(code) for _ in range(args.runs))
+        status = "OK" if t <= args.budget else "ESTOUROU"
+        ok = ok and t <= args.budget
+        print(f"[{status}] {nome}: {t:.3f}s (orçamento {args.budget:.3f}s)")
+
+    pesados = heavy_modules_loaded()
+    if pesados:
+        ok = False
+        print(f"[ERRO] 'import main' carregou: {', '.join(pesados)}")
+    else:
+        print("[OK] 'import main' não carrega TensorFlow/Keras/OpenCV")
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import random
+
+import numpy as np
+
+from dataset import load_image, extract_patches
+
+
+def stream_image_patches(files, patch_size=(32, 32), stride=None, shuffle_files=True, seed=None):
+    """
+    Lê as imagens uma por vez e gera (patches, labels) de cada uma.
+    files = [(caminho, label), ...] (ver dataset.list_labeled_files).
+    Só uma imagem fica na memória por vez.
+    """
+    arquivos = list(files)
+    if shuffle_files:
+        random.Random(seed).shuffle(arquivos)
+
+    for img_path, label in arquivos:
+        try:
+            patches, _ = extract_patches(load_image(img_path), patch_size, stride)
+        except Exception as e:
+            print(f"[ERRO] Falha ao carregar {img_path}: {e}")
+            continue
+        if patches.shape[0]:
+            yield patches, np.full(patches.shape[0], label, dtype=np.int32)
+
+
+def make_patch_dataset(files, patch_size=(32, 32), batch_size=64, shuffle_buffer=10000,
+                       stride=None, seed=None, shuffle=True):
+    """
+    Pipeline tf.data para treino em streaming: lê imagens sob demanda,
+    embaralha os patches num buffer limitado, monta lotes (uint8; o modelo
+    normaliza) e faz prefetch enquanto o modelo treina.
+    files = [(caminho, label), ...]; shuffle=False para validação.
+    """
+    import tensorflow as tf
+
+    def gerador():
+        # Chamado a cada época; com seed=None a ordem dos arquivos muda
+        return stream_image_patches(files, patch_size, stride, shuffle_files=shuffle, seed=seed)
+
+    ds = tf.data.Dataset.from_generator(
+        gerador,
+        output_signature=(
+            tf.TensorSpec(shape=(None, patch_size[0], patch_size[1], 3), dtype=tf.uint8),
+            tf.TensorSpec(shape=(None,), dtype=tf.int32),
+        )
+    )
+    ds = ds.unbatch()
+    if shuffle:
+        ds = ds.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size)
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+
+def iter_index_batches(X, y, indices, batch_size=64, shuffle=True, rng=None):
+    """
+    Gera lotes (X[lote], y[lote]) lendo só os índices de cada lote (X pode
+    ser um memmap: nada além do lote vai para a memória). Com shuffle, a
+    ordem muda a cada chamada; dentro do lote os índices ficam ordenados
+    para a leitura do disco seguir em frente.
+    """
+    indices = np.asarray(indices)
+    if shuffle:
+        indices = (rng or np.random.default_rng()).permutation(indices)
+    for k in range(0, indices.size, batch_size):
+        lote = np.sort(indices[k:k + batch_size])
+        yield X[lote], y[lote].astype(np.int32)
+
+
+def make_memmap_dataset(X, y, indices, batch_size=64, shuffle=True, seed=None):
+    """
+    Pipeline tf.data sobre um dataset de patches em disco (memmap do
+    patch_cache), restrito a `indices` (ex.: de training.split_indices).
+    Vários processos podem treinar no mesmo arquivo sem copiá-lo: cada um
+    só lê os lotes que está usando.
+    """
+    import tensorflow as tf
+
+    rng = np.random.default_rng(seed)
+
+    def gerador():
+        # Chamado a cada época: nova permutação dos índices
+        return iter_index_batches(X, y, indices, batch_size, shuffle, rng)
+
+    ds = tf.data.Dataset.from_generator(
+        gerador,
+        output_signature=(
+            tf.TensorSpec(shape=(None,) + tuple(X.shape[1:]), dtype=tf.as_dtype(X.dtype)),
+            tf.TensorSpec(shape=(None,), dtype=tf.int32),
+        )
+    )
+    return ds.prefetch(tf.data.AUTOTUNE)
@@ -0,0 +1,241 @@
+"""
+Busca de hiperparâmetros/arquitetura da CNN em paralelo.
+
+Treina várias configurações de build_cnn (filtros, largura da Dense,
+otimizador, taxa de aprendizado, batch_size, patch_size) num pool de
+processos, com as threads do TensorFlow limitadas em cada worker para os
+treinos não disputarem os mesmos núcleos. Cada patch_size usa um único
+dataset em disco (.npy do patch_cache), aberto com mmap por todos os
+workers, que leem só os lotes em uso. O custo de inferência é medido
+depois que todos os treinos terminam, um modelo por vez (sem disputa por
+núcleos), e o resultado é ordenado por esse custo entre as configurações
+que atingem a acurácia alvo.
+
+    python sweep.py --filters 8,16 16,32 --dense-units 32 64 --workers 4 --target 0.95
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from main import TRAIN_SOURCES, CACHE_FOLDER
+from patch_cache import load_patches_cached
+from training import split_indices
+
+
+def expand_grid(grid):
+    """
+    {'a': [1, 2], 'b': [3]} -> [{'a': 1, 'b': 3}, {'a': 2, 'b': 3}]
+    """
+    nomes = list(grid)
+    return [dict(zip(nomes, valores)) for valores in itertools.product(*(grid[n] for n in nomes))]
+
+
+def prepare_datasets(patch_sizes, sources=TRAIN_SOURCES, cache_dir=CACHE_FOLDER):
+    """
+    Gera (ou reaproveita) o dataset de patches de cada patch_size e retorna
+    {patch_size: (caminho_X, caminho_y)} para os workers abrirem com mmap.
+    Cada patch_size tem sua subpasta em cache_dir (o patch_cache apaga os
+    .npy que não pertencem ao dataset atual da pasta).
+    """
+    caminhos = {}
+    for patch_size in patch_sizes:
+        pasta = os.path.join(cache_dir, "sweep", f"{patch_size[0]}x{patch_size[1]}")
+        X, _ = load_patches_cached(sources, pasta, patch_size)
+        if X.shape[0] == 0:
+            print(f"[ERRO] Nenhum patch gerado para patch_size={patch_size}.")
+            continue
+        caminhos[patch_size] = (X.filename, X.filename[:-len("_X.npy")] + "_y.npy")
+    return caminhos
+
+
+def _init_worker(threads):
+    """
+    Limita as threads do TensorFlow no processo do worker (antes de qualquer
+    operação do framework).
+    """
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _train_one(config, x_path, y_path, epochs, patience, validation_split, seed, model_path):
+    """
+    Treina uma configuração, mede a acurácia de validação e salva o modelo
+    em model_path (para a medição de inferência, feita depois do pool).
+    Os lotes são lidos do memmap por índice: nenhum worker copia o dataset.
+    """
+    from cnn_model import build_cnn
+    from streaming import make_memmap_dataset
+    from training import fit_controlled
+
+    X = np.load(x_path, mmap_mode='r')
+    y = np.load(y_path, mmap_mode='r')
+    idx_treino, idx_val = split_indices(X.shape[0], validation_split, seed)
+    train = make_memmap_dataset(X, y, idx_treino, config['batch_size'], shuffle=True, seed=seed)
+    validation = make_memmap_dataset(X, y, idx_val, 1024, shuffle=False)
+
+    patch_size = tuple(config['patch_size'])
+    cnn = build_cnn((patch_size[0], patch_size[1], 3), filters=tuple(config['filters']),
+                    dense_units=config['dense_units'], optimizer=config['optimizer'],
+                    learning_rate=config['learning_rate'])
+
+    inicio = time.perf_counter()
+    history = fit_controlled(cnn, train, validation, epochs=epochs, batch_size=config['batch_size'],
+                             patience=patience, verbose=0)
+    tempo_treino = time.perf_counter() - inicio
+
+    _, acuracia = cnn.evaluate(validation, verbose=0)
+    cnn.save(model_path)
+
+    return dict(config,
+                val_accuracy=float(acuracia),
+                params=int(cnn.count_params()),
+                epochs_run=len(history.history['loss']),
+                train_s=tempo_treino)
+
+
+def _time_inference(model_path, x_path, validation_split, seed, n=4096, repeats=3):
+    """
+    ms por 1000 patches de validação (melhor de `repeats` medições), com o
+    modelo sozinho no processo.
+    """
+    from keras.models import load_model
+
+    X = np.load(x_path, mmap_mode='r')
+    _, idx_val = split_indices(X.shape[0], validation_split, seed)
+    amostra = np.asarray(X[idx_val[:n]])
+    cnn = load_model(model_path)
+    cnn.predict(amostra[:64], verbose=0)  # aquecimento
+    tempos = []
+    for _ in range(repeats):
+        inicio = time.perf_counter()
+        cnn.predict(amostra, batch_size=amostra.shape[0], verbose=0)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos) * 1000 / amostra.shape[0] * 1000
+
+
+def rank(resultados, target):
+    """
+    Ordena: primeiro as configurações com val_accuracy >= target, da mais
+    barata para a mais cara (ms por 1000 patches); depois as demais, da
+    mais precisa para a menos precisa.
+    """
+    ok = sorted((r for r in resultados if r['val_accuracy'] >= target), key=lambda r: r['ms_per_1k_patches'])
+    resto = sorted((r for r in resultados if r['val_accuracy'] < target), key=lambda r: -r['val_accuracy'])
+    return ok, resto
+
+
+def run_sweep(grid, workers=None, epochs=50, patience=5, validation_split=0.2, seed=0):
+    """
+    Treina todas as combinações de grid em paralelo e retorna a lista de
+    resultados (uma entrada por configuração).
+    """
+    workers = workers or max(1, (os.cpu_count() or 1) // 2)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    configs = expand_grid(grid)
+    datasets = prepare_datasets(sorted({tuple(c['patch_size']) for c in configs}))
+    configs = [c for c in configs if tuple(c['patch_size']) in datasets]
+
+    print(f"\n🔬 {len(configs)} configurações, {workers} workers x {threads} threads do TensorFlow")
+    treinados = []   # (resultado, caminho do modelo)
+    # spawn: o TensorFlow não é seguro depois de um fork
+    contexto = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory(prefix="sweep_") as pasta_modelos:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=contexto,
+                                 initializer=_init_worker, initargs=(threads,)) as pool:
+            futuros = {}
+            for k, c in enumerate(configs):
+                model_path = os.path.join(pasta_modelos, f"config_{k}.h5")
+                futuro = pool.submit(_train_one, c, *datasets[tuple(c['patch_size'])], epochs, patience,
+                                     validation_split, seed, model_path)
+                futuros[futuro] = (c, model_path)
+            for futuro in as_completed(futuros):
+                c, model_path = futuros[futuro]
+                try:
+                    r = futuro.result()
+                except Exception as e:
+                    print(f"[ERRO] Configuração {c} falhou: {e}")
+                    continue
+                treinados.append((r, model_path))
+                print(f"[OK] {_descreve(r)}: acurácia {r['val_accuracy']:.4f}")
+
+        # Inferência medida só depois de todos os treinos, um modelo por vez
+        # num processo com todos os núcleos: o ranking não depende de quais
+        # treinos estavam rodando ao mesmo tempo.
+        print(f"\n⏱️ Medindo a inferência de {len(treinados)} modelos...")
+        resultados = []
+        with ProcessPoolExecutor(max_workers=1, mp_context=contexto, initializer=_init_worker,
+                                 initargs=(os.cpu_count() or 1,)) as pool:
+            for r, model_path in treinados:
+                x_path, _ = datasets[tuple(r['patch_size'])]
+                try:
+                    r['ms_per_1k_patches'] = pool.submit(_time_inference, model_path, x_path,
+                                                         validation_split, seed).result()
+                except Exception as e:
+                    print(f"[ERRO] Medição de {_descreve(r)} falhou: {e}")
+                    continue
+                resultados.append(r)
+                print(f"  {_descreve(r)}: {r['ms_per_1k_patches']:.1f} ms/1000 patches")
+    return resultados
+
+
+def _descreve(r):
+    return (f"patch={r['patch_size'][0]} filtros={'/'.join(map(str, r['filters']))} "
+            f"dense={r['dense_units']} {r['optimizer']} lr={r['learning_rate']} lote={r['batch_size']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Busca de hiperparâmetros da CNN em paralelo.")
+    parser.add_argument("--patch-sizes", type=int, nargs="+", default=[32], help="lados de patch (quadrado)")
+    parser.add_argument("--filters", nargs="+", default=["16,32"],
+                        help="filtros por bloco, separados por vírgula (ex.: 8,16 16,32)")
+    parser.add_argument("--dense-units", type=int, nargs="+", default=[64])
+    parser.add_argument("--optimizers", nargs="+", default=["adam"])
+    parser.add_argument("--lrs", type=float, nargs="+", default=[1e-3])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[64])
+    parser.add_argument("--epochs", type=int, default=50)
+    parser.add_argument("--patience", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None, help="processos em paralelo")
+    parser.add_argument("--target", type=float, default=0.95, help="acurácia de validação mínima")
+    parser.add_argument("--output", default="sweep_results.json")
+    args = parser.parse_args(argv)
+
+    grid = {
+        'patch_size': [(p, p) for p in args.patch_sizes],
+        'filters': [tuple(int(n) for n in f.split(",")) for f in args.filters],
+        'dense_units': args.dense_units,
+        'optimizer': args.optimizers,
+        'learning_rate': args.lrs,
+        'batch_size': args.batch_sizes,
+    }
+    resultados = run_sweep(grid, args.workers, args.epochs, args.patience)
+    ok, resto = rank(resultados, args.target)
+
+    print(f"\n🏁 Configurações com acurácia >= {args.target} (da mais barata para a mais cara):")
+    for r in ok:
+        print(f"  {_descreve(r):<60} acc {r['val_accuracy']:.4f}  "
+              f"{r['ms_per_1k_patches']:7.1f} ms/1000 patches  {r['params']} parâmetros")
+    if not ok:
+        print("  (nenhuma)")
+    if resto:
+        melhor = resto[0]
+        print(f"\n⚠️ {len(resto)} abaixo do alvo; a melhor delas: {_descreve(melhor)} ({melhor['val_accuracy']:.4f})")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'target': args.target, 'ranked': ok, 'below_target': resto}, f, indent=2)
+    print(f"\n📄 Resultados em {args.output}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
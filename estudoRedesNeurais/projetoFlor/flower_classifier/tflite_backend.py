@@ -0,0 +1,78 @@
+import numpy as np
+
+
+def _interpreter_class():
+    """
+    Usa o pacote leve tflite_runtime quando instalado; senão cai para o
+    interpretador que vem com o TensorFlow.
+    """
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        # "from tensorflow.lite import Interpreter" pega o pacote em disco
+        # tensorflow/lite, não a API pública tf.lite
+        import tensorflow as tf
+
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteModel:
+    """
+    Modelo .tflite com a mesma interface de predict usada no teste
+    (predict_batched), rodando só no interpretador TFLite.
+    Aceita modelos float32/float16 e modelos INT8 com entrada/saída quantizadas.
+
+    predict recebe patches uint8 (0-255). Modelos exportados de um build_cnn
+    com Rescaling recebem os pixels direto; os exportados de modelos antigos
+    (entrada em [0, 1]) têm a divisão por 255 feita aqui.
+    """
+
+    def __init__(self, model_path, num_threads=None):
+        self.model_path = model_path
+        self.interpreter = _interpreter_class()(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        self.input_shape = tuple(self.input['shape'])
+        self._batch = self.input_shape[0]
+
+        dtype = self.input['dtype']
+        scale, _ = self.input['quantization']
+        if np.issubdtype(dtype, np.integer) and scale:
+            # escala ~1/255: a entrada foi calibrada em [0, 1] (modelo antigo)
+            self.raw_input = scale > 0.1
+        else:
+            self.raw_input = dtype == np.uint8
+
+    def _resize(self, batch):
+        if batch != self._batch:
+            shape = (batch,) + self.input_shape[1:]
+            self.interpreter.resize_tensor_input(self.input['index'], shape)
+            self.interpreter.allocate_tensors()
+            self._batch = batch
+
+    def predict(self, x, batch_size=None, verbose=0):
+        """
+        x = patches uint8 (0-255). Retorna scores (N, 1) em float32.
+        """
+        x = np.asarray(x)
+        if x.shape[0] == 0:
+            return np.zeros((0, 1), dtype='float32')
+        self._resize(x.shape[0])
+
+        if not self.raw_input:
+            x = x.astype('float32') / 255.0
+        dtype = self.input['dtype']
+        scale, zero_point = self.input['quantization']
+        if np.issubdtype(dtype, np.integer) and scale:
+            info = np.iinfo(dtype)
+            x = np.clip(np.round(x / scale + zero_point), info.min, info.max)
+        self.interpreter.set_tensor(self.input['index'], x.astype(dtype, copy=False))
+        self.interpreter.invoke()
+
+        y = self.interpreter.get_tensor(self.output['index'])
+        if np.issubdtype(self.output['dtype'], np.integer):
+            scale, zero_point = self.output['quantization']
+            y = (y.astype('float32') - zero_point) * scale
+        return y.astype('float32').reshape(x.shape[0], -1)
@@ -0,0 +1,164 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from cnn_model import expects_raw_pixels, model_input
+from tflite_backend import TFLiteModel
+
+
+def sample_patches(X, y, n, seed=0):
+    """
+    Amostra n patches (uint8) e seus labels.
+    """
+    idx = np.random.default_rng(seed).permutation(X.shape[0])[:n]
+    idx.sort()  # leitura sequencial quando X é um memmap
+    return np.asarray(X[idx]), np.asarray(y[idx])
+
+
+def _float_input_twin(model):
+    """
+    Mesmo modelo (mesmas camadas e pesos) com entrada float32 em 0-255, para
+    a quantização INT8: o conversor não quantiza a partir de uma entrada
+    uint8, então a calibração da entrada é feita na faixa dos pixels.
+    """
+    from keras import layers, models
+
+    entrada = layers.Input(shape=model.input_shape[1:], dtype='float32')
+    x = entrada
+    for layer in model.layers:
+        x = layer(x)
+    return models.Model(entrada, x)
+
+
+def export_tflite(model, out_dir, calib_patches, name="cnn_model"):
+    """
+    Exporta o modelo Keras como SavedModel e como TFLite float16 e INT8.
+    O INT8 é calibrado com calib_patches (uint8) e tem entrada/saída uint8.
+    Retorna {'saved_model': ..., 'float16': ..., 'int8': ...} com os caminhos.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {'saved_model': os.path.join(out_dir, f"{name}_saved_model")}
+    model.save(paths['saved_model'], save_format='tf')
+
+    # float16: pesos em meia precisão, cálculo em float
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.target_spec.supported_types = [tf.float16]
+    paths['float16'] = os.path.join(out_dir, f"{name}_float16.tflite")
+    with open(paths['float16'], 'wb') as f:
+        f.write(converter.convert())
+
+    # INT8: quantização completa, calibrada nos patches reais
+    grafo = _float_input_twin(model) if expects_raw_pixels(model) else model
+
+    def representative_dataset():
+        for patch in calib_patches:
+            yield [model_input(model, patch[np.newaxis]).astype('float32')]
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(grafo)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.uint8
+    converter.inference_output_type = tf.uint8
+    paths['int8'] = os.path.join(out_dir, f"{name}_int8.tflite")
+    with open(paths['int8'], 'wb') as f:
+        f.write(converter.convert())
+
+    return paths
+
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+
+# Roda num processo novo: carrega o modelo com um backend, faz uma predição
+# e imprime o tempo de carga (imports + modelo) e o pico de RSS em JSON.
+_FOOTPRINT_CODE = """
+import json, sys, time
+inicio = time.perf_counter()
+backend, path = sys.argv[1], sys.argv[2]
+if backend == 'keras':
+    from keras.models import load_model
+    model = load_model(path)
+else:
+    from tflite_backend import TFLiteModel
+    model = TFLiteModel(path)
+load_s = time.perf_counter() - inicio
+import numpy as np
+from cnn_model import model_input
+model.predict(model_input(model, np.zeros((1,) + tuple(model.input_shape[1:]), dtype='uint8')), verbose=0)
+from instrumentation import peak_rss_mb
+print(json.dumps({'load_s': load_s, 'rss_mb': peak_rss_mb(), 'tensorflow_loaded': 'tensorflow' in sys.modules}))
+"""
+
+
+def measure_footprint(backend, path):
+    """
+    Tempo de carga e pico de RSS de um backend ("keras" ou "tflite")
+    sozinho, num processo Python novo (como em startup_check): no processo
+    atual o TensorFlow e os outros modelos já estão carregados.
+    Retorna {'load_s', 'rss_mb', 'tensorflow_loaded'}.
+    """
+    out = subprocess.run([sys.executable, "-c", _FOOTPRINT_CODE, backend, os.path.abspath(path)],
+                         cwd=BASE_PATH, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def accuracy_report(keras_model, tflite_paths, X, y, threshold=0.5, batch_size=256, keras_path=None):
+    """
+    Compara os modelos TFLite com o modelo Keras nos mesmos patches:
+    diferença de score, concordância no threshold, acurácia, tamanho do
+    arquivo e latência por patch. Tempo de carga e pico de RSS de cada
+    backend são medidos num processo novo (measure_footprint); o do Keras
+    só se keras_path (o .h5) for informado.
+    """
+    def mede(model):
+        inicio = time.perf_counter()
+        preds = np.concatenate([
+            model.predict(model_input(model, X[k:k + batch_size]), batch_size=batch_size,
+                          verbose=0).reshape(-1)
+            for k in range(0, X.shape[0], batch_size)
+        ])
+        return preds, (time.perf_counter() - inicio) / max(X.shape[0], 1)
+
+    ref, ref_lat = mede(keras_model)
+    report = {
+        'n_patches': int(X.shape[0]),
+        'threshold': threshold,
+        'keras': {
+            'accuracy': float(np.mean((ref >= threshold) == y)),
+            'latency_ms_per_patch': ref_lat * 1000,
+        },
+    }
+    if keras_path is not None:
+        report['keras'].update(measure_footprint('keras', keras_path))
+
+    for nome, path in tflite_paths.items():
+        if not path.endswith('.tflite'):
+            continue
+        preds, lat = mede(TFLiteModel(path))
+        report[nome] = {
+            'path': path,
+            'size_kb': os.path.getsize(path) / 1024,
+            'latency_ms_per_patch': lat * 1000,
+            'accuracy': float(np.mean((preds >= threshold) == y)),
+            'accuracy_delta': float(np.mean((preds >= threshold) == y) - report['keras']['accuracy']),
+            'agreement': float(np.mean((preds >= threshold) == (ref >= threshold))),
+            'max_abs_diff': float(np.max(np.abs(preds - ref))) if preds.size else 0.0,
+            'mean_abs_diff': float(np.mean(np.abs(preds - ref))) if preds.size else 0.0,
+        }
+        report[nome].update(measure_footprint('tflite', path))
+        if report[nome]['tensorflow_loaded']:
+            # sem tflite_runtime o interpretador vem do TensorFlow: carga e RSS iguais aos do Keras
+            report[nome]['footprint_note'] = ("interpretador do TensorFlow (tflite_runtime não instalado): "
+                                              "carga e RSS incluem o TensorFlow inteiro")
+    return report
+
+
+def save_report(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
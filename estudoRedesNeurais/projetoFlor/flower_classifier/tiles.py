@@ -0,0 +1,238 @@
+import json
+import os
+
+import numpy as np
+from PIL import Image
+
+from inference import predict_batched, caixa_unica
+
+
+class NpyTileReader:
+    """
+    Imagem crua (H, W, 3) uint8 num .npy, aberta com mmap: cada região é
+    lida do disco só quando pedida, então a memória não depende do tamanho
+    da imagem.
+    """
+
+    def __init__(self, path):
+        self.array = np.load(path, mmap_mode='r')
+        self.shape = self.array.shape
+
+    def read(self, y0, y1, x0, x1):
+        return np.array(self.array[y0:y1, x0:x1, :3])
+
+
+class PILTileReader:
+    """
+    Leitura por regiões com o PIL, decodificando só os blocos do arquivo
+    que cobrem a região pedida:
+    - formatos gravados em vários blocos (ex.: TIFF em strips/tiles): só os
+      blocos que cruzam a região;
+    - formatos crus num bloco só (BMP, PPM, TIFF sem compressão...): só as
+      linhas da região, lidas direto do offset no arquivo.
+    Formatos comprimidos num fluxo único (PNG, JPEG, TIFF comprimido...)
+    não permitem isso: o PIL decodificaria a imagem inteira já no primeiro
+    tile, então são recusados (ValueError); converta antes para .npy (to_npy).
+
+    A área decodificada (linhas inteiras, no caso cru) fica guardada até a
+    próxima leitura fora dela: os tiles vizinhos de uma mesma faixa
+    (iter_tiles percorre linha a linha) não decodificam tudo de novo.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with _abre_grande(path) as image:
+            w, h = image.size
+            self.mode = image.mode
+            self.format = image.format
+            self._blocos = list(image.tile)
+        self.shape = (h, w, 3)
+        self._linha_crua = _linha_crua(self._blocos, self.mode, w, h)
+        self._area = None   # ((rx0, ry0, rx1, ry1), imagem decodificada)
+        if len(self._blocos) < 2 and self._linha_crua is None:
+            raise ValueError(
+                f"{path}: o formato {self.format} não permite ler só uma região (o PIL decodificaria a "
+                f"imagem inteira). Converta para .npy com 'python main.py to-npy {path}' ou use TIFF/BMP/PPM "
+                f"sem compressão."
+            )
+
+    def _blocos_da_regiao(self, y0, y1, x0, x1):
+        """
+        Blocos (decoder, caixa, offset, args) que cobrem a região.
+        """
+        if self._linha_crua is not None:
+            # bloco cru único: as linhas y0..y1 formam um bloco próprio
+            nome, (bx0, by0, bx1, by1), offset, args = self._blocos[0]
+            passo, direcao = self._linha_crua
+            primeira = y0 if direcao > 0 else by1 - y1   # linhas de baixo para cima (BMP)
+            rawmode = args if isinstance(args, str) else args[0]
+            return [_bloco(self._blocos[0], (bx0, y0, bx1, y1), offset + primeira * passo, (rawmode, passo, direcao))]
+        return [b for b in self._blocos
+                if b[1][0] < x1 and b[1][2] > x0 and b[1][1] < y1 and b[1][3] > y0]
+
+    def read(self, y0, y1, x0, x1):
+        y0, y1, x0, x1 = int(y0), int(y1), int(x0), int(x1)   # o decoder do PIL não aceita inteiros do NumPy
+        blocos = self._blocos_da_regiao(y0, y1, x0, x1)
+        if self._area is not None:
+            (ax0, ay0, ax1, ay1), image = self._area
+            if ax0 <= x0 and ay0 <= y0 and x1 <= ax1 and y1 <= ay1:
+                return np.asarray(image.crop((x0 - ax0, y0 - ay0, x1 - ax0, y1 - ay0)).convert('RGB'))
+
+        rx0 = min(b[1][0] for b in blocos)
+        ry0 = min(b[1][1] for b in blocos)
+        rx1 = max(b[1][2] for b in blocos)
+        ry1 = max(b[1][3] for b in blocos)
+        if self._area is not None:
+            self._area[1].close()   # libera a área anterior antes de decodificar a nova
+            self._area = None
+        image = _abre_grande(self.path)
+        # imagem "virtual" do tamanho da área dos blocos escolhidos
+        image._size = (rx1 - rx0, ry1 - ry0)
+        image.tile = [_bloco(b, (bx0 - rx0, by0 - ry0, bx1 - rx0, by1 - ry0), offset, args)
+                      for b in blocos for _, (bx0, by0, bx1, by1), offset, args in [b]]
+        image.load()
+        self._area = ((rx0, ry0, rx1, ry1), image)
+        return np.asarray(image.crop((x0 - rx0, y0 - ry0, x1 - rx0, y1 - ry0)).convert('RGB'))
+
+
+def _bloco(bloco, caixa, offset, args):
+    # o PIL recente usa ImageFile._Tile (namedtuple); versões antigas, tuplas
+    if hasattr(bloco, "_replace"):
+        return bloco._replace(extents=caixa, offset=offset, args=args)
+    return (bloco[0], caixa, offset, args)
+
+
+def _abre_grande(path):
+    """
+    Image.open sem o limite de pixels do PIL (proteção contra "decompression
+    bomb"), que recusaria as imagens gigantes deste módulo. O limite só é
+    desligado durante a abertura, não para o resto do processo.
+    """
+    limite = Image.MAX_IMAGE_PIXELS
+    Image.MAX_IMAGE_PIXELS = None
+    try:
+        return Image.open(path)
+    finally:
+        Image.MAX_IMAGE_PIXELS = limite
+
+
+def _linha_crua(blocos, mode, w, h):
+    """
+    (bytes por linha, direção) se o arquivo é um único bloco cru cobrindo a
+    imagem toda (dá para ler qualquer faixa de linhas pelo offset); senão None.
+    """
+    if len(blocos) != 1:
+        return None
+    nome, caixa, _, args = blocos[0]
+    if isinstance(args, str):
+        args = (args,)
+    if nome != "raw" or tuple(caixa) != (0, 0, w, h) or not isinstance(args, tuple):
+        return None
+    rawmode = args[0]
+    passo = args[1] if len(args) > 1 else 0
+    direcao = args[2] if len(args) > 2 else 1
+    if not passo:
+        if rawmode != mode:
+            return None
+        passo = w * len(Image.new(mode, (1, 1)).tobytes())
+    return passo, direcao
+
+
+def open_tiled(path):
+    """
+    Escolhe o leitor pelo tipo do arquivo (.npy -> mmap; resto -> PIL).
+    """
+    if path.lower().endswith('.npy'):
+        return NpyTileReader(path)
+    return PILTileReader(path)
+
+
+def to_npy(path, out_path, rows_per_block=1024):
+    """
+    Converte uma imagem para .npy cru (uint8 RGB), escrevendo em blocos de
+    linhas num arquivo mapeado em memória. Formatos que PILTileReader lê por
+    partes são convertidos por partes; os demais (PNG, JPEG...) precisam ser
+    decodificados inteiros, uma única vez, aqui.
+    """
+    try:
+        reader = PILTileReader(path)
+    except ValueError:
+        reader = None
+    with _abre_grande(path) as image:
+        w, h = image.size
+        out = np.lib.format.open_memmap(out_path, mode='w+', dtype=np.uint8, shape=(h, w, 3))
+        if reader is None:
+            image = image.convert('RGB')
+        for y0 in range(0, h, rows_per_block):
+            y1 = min(y0 + rows_per_block, h)
+            out[y0:y1] = reader.read(y0, y1, 0, w) if reader else np.asarray(image.crop((0, y0, w, y1)))
+    out.flush()
+    return out_path
+
+
+def iter_tiles(reader, tile_size=2048, patch_size=(32, 32), stride=None):
+    """
+    Gera ((y0, x0), tile) cobrindo a imagem. As origens dos tiles ficam na
+    grade do stride e cada tile tem patch_size - stride de sobra na borda,
+    então cada janela aparece inteira em exatamente um tile (sem duplicatas
+    nem janelas cortadas na junção de dois tiles).
+    """
+    ph, pw = patch_size
+    sh, sw = stride or patch_size
+    th = max(sh, tile_size // sh * sh)
+    tw = max(sw, tile_size // sw * sw)
+    h, w = reader.shape[:2]
+    for y0 in range(0, max(h - ph, 0) + 1, th):
+        for x0 in range(0, max(w - pw, 0) + 1, tw):
+            y1 = min(y0 + th + ph - sh, h)
+            x1 = min(x0 + tw + pw - sw, w)
+            yield (y0, x0), reader.read(y0, y1, x0, x1)
+
+
+def score_tiled(cnn, path, patch_size=(32, 32), stride=None, tile_size=2048, batch_size=4096,
+                threshold=0.3, prefilter=None, metrics=None):
+    """
+    Avalia uma imagem grande tile a tile, com memória limitada pelo tamanho
+    do tile e do lote (não pelo tamanho da imagem).
+
+    Retorna (caixa, grade): caixa = (x0, y0, x1, y1) envolvendo todos os
+    patches de flor da imagem inteira (ou None) e grade = scores (float32)
+    de cada janela, em coordenadas globais (linha = i // stride).
+    """
+    stride = stride or patch_size
+    reader = open_tiled(path)
+    h, w = reader.shape[:2]
+    nh = (h - patch_size[0]) // stride[0] + 1 if h >= patch_size[0] else 0
+    nw = (w - patch_size[1]) // stride[1] + 1 if w >= patch_size[1] else 0
+    grade = np.zeros((nh, nw), dtype='float32')
+
+    caixa = None
+    tiles = iter_tiles(reader, tile_size, patch_size, stride)
+    for (y0, x0), _, positions, preds in predict_batched(cnn, tiles, patch_size, batch_size,
+                                                         stride, prefilter=prefilter, metrics=metrics):
+        if not len(preds):
+            continue
+        globais = positions + np.array([y0, x0])
+        grade[globais[:, 0] // stride[0], globais[:, 1] // stride[1]] = preds
+
+        # junta as detecções dos tiles numa caixa única, como no teste normal
+        c = caixa_unica(globais, preds, patch_size, threshold)
+        if c is not None:
+            caixa = c if caixa is None else (
+                min(caixa[0], c[0]), min(caixa[1], c[1]), max(caixa[2], c[2]), max(caixa[3], c[3])
+            )
+    return caixa, grade
+
+
+def save_tiled_result(out_folder, path, caixa, grade):
+    """
+    Grava a grade de scores (.npy) e a caixa (.json) de uma imagem.
+    """
+    os.makedirs(out_folder, exist_ok=True)
+    nome = os.path.splitext(os.path.basename(path))[0]
+    grade_path = os.path.join(out_folder, f"resultado_{nome}_scores.npy")
+    np.save(grade_path, grade)
+    with open(os.path.join(out_folder, f"resultado_{nome}.json"), 'w', encoding='utf-8') as f:
+        json.dump({'image': path, 'box': list(caixa) if caixa else None,
+                   'grid_shape': list(grade.shape)}, f, indent=2)
+    return grade_path
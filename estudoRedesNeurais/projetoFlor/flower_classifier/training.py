@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+
+def split_indices(n, validation_split=0.2, seed=0):
+    """
+    Embaralha 0..n-1 e separa (treino, validação). Os índices voltam
+    ordenados para a leitura de um memmap continuar sequencial.
+    """
+    idx = np.random.default_rng(seed).permutation(n)
+    n_val = int(round(n * validation_split))
+    return np.sort(idx[n_val:]), np.sort(idx[:n_val])
+
+
+def split_files(files, validation_split=0.2, seed=0):
+    """
+    Separa uma lista [(caminho, label), ...] em treino e validação por
+    imagem (todos os patches de uma imagem ficam do mesmo lado).
+    """
+    treino, val = split_indices(len(files), validation_split, seed)
+    return [files[k] for k in treino], [files[k] for k in val]
+
+
+def _time_budget_callback(budget_s):
+    """
+    Callback que interrompe o treino quando o tempo (s) acaba.
+    """
+    from keras.callbacks import Callback
+
+    class TimeBudget(Callback):
+        def on_train_begin(self, logs=None):
+            self.inicio = time.perf_counter()
+            self.estourou = False
+
+        def on_train_batch_end(self, batch, logs=None):
+            if time.perf_counter() - self.inicio > budget_s:
+                self.estourou = True
+                self.model.stop_training = True
+
+    return TimeBudget()
+
+
+def _sem_nomes(config):
+    # nomes automáticos das camadas (conv2d_3...) dependem de quantos modelos
+    # já foram criados no processo; não fazem parte da arquitetura
+    if isinstance(config, dict):
+        return {k: _sem_nomes(v) for k, v in config.items() if k != 'name'}
+    if isinstance(config, (list, tuple)):
+        return [_sem_nomes(v) for v in config]
+    return config
+
+
+def run_key(model, batch_size, dataset_id=None):
+    """
+    Identifica um treino: arquitetura (config do modelo), otimizador e taxa
+    de aprendizado, batch_size e o dataset (dataset_id, ex.:
+    patch_cache.dataset_key). Um checkpoint só é retomado pelo mesmo treino.
+    """
+    config = {
+        'model': _sem_nomes(model.get_config()),
+        'optimizer': model.optimizer.get_config() if model.optimizer is not None else None,
+        'batch_size': batch_size,
+        'dataset': dataset_id,
+    }
+    return hashlib.sha1(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def fit_controlled(model, train, validation, epochs=500, batch_size=64, patience=10,
+                   time_budget=None, checkpoint_dir=None, resume=True, verbose=1, dataset_id=None):
+    """
+    Treina com controle de parada e checkpoints.
+
+    train / validation = (X, y) ou um tf.data.Dataset.
+    - para quando val_loss não melhora por patience épocas ou quando
+      time_budget segundos se esgotam; nos dois casos o modelo volta aos
+      melhores pesos;
+    - com checkpoint_dir, salva o estado a cada época em
+      checkpoint_dir/run_<chave> (chave = run_key: arquitetura, otimizador,
+      batch_size e dataset_id) e, se resume=True, continua do último
+      checkpoint caso o mesmo treino tenha sido interrompido. O melhor
+      modelo desse treino fica em checkpoint_dir/run_<chave>/best.h5.
+    Retorna o History do Keras (só com as épocas rodadas nesta chamada).
+    """
+    from keras import callbacks
+
+    early = callbacks.EarlyStopping(monitor='val_loss', patience=patience,
+                                    restore_best_weights=True, verbose=verbose)
+    ultima = {'epoca': 0}   # épocas concluídas, contando as anteriores a uma retomada
+    cbs = [early, callbacks.LambdaCallback(on_epoch_end=lambda epoch, logs: ultima.update(epoca=epoch + 1))]
+
+    budget = None
+    if time_budget:
+        budget = _time_budget_callback(time_budget)
+        cbs.append(budget)
+
+    best_path = None
+    if checkpoint_dir:
+        run_dir = os.path.join(checkpoint_dir, f"run_{run_key(model, batch_size, dataset_id)}")
+        backup_dir = os.path.join(run_dir, "backup")
+        best_path = os.path.join(run_dir, "best.h5")
+        if not resume and os.path.exists(run_dir):
+            shutil.rmtree(run_dir)
+        if not os.path.exists(backup_dir) and os.path.exists(best_path):
+            os.remove(best_path)   # best.h5 de um treino anterior já concluído
+        os.makedirs(run_dir, exist_ok=True)
+        # BackupAndRestore retoma da última época salva se o processo morrer
+        cbs.append(callbacks.BackupAndRestore(backup_dir))
+        cbs.append(callbacks.ModelCheckpoint(best_path, monitor='val_loss', save_best_only=True))
+
+    if isinstance(train, tuple):
+        X, y = train
+        history = model.fit(X, y, validation_data=validation, epochs=epochs,
+                            batch_size=batch_size, callbacks=cbs, verbose=verbose)
+    else:
+        history = model.fit(train, validation_data=validation, epochs=epochs,
+                            callbacks=cbs, verbose=verbose)
+
+    epocas = ultima['epoca']
+    if budget is not None and budget.estourou:
+        print(f"⏱️ Orçamento de tempo ({time_budget:.0f}s) esgotado após {epocas} épocas.")
+        # o EarlyStopping só restaura os melhores pesos quando ele mesmo para
+        if best_path is not None and os.path.exists(best_path):
+            model.load_weights(best_path)
+        elif early.best_weights is not None:
+            model.set_weights(early.best_weights)
+    elif early.stopped_epoch > 0:
+        print(f"🛑 Parada antecipada: val_loss sem melhora há {patience} épocas ({epocas} épocas).")
+    return history